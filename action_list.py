@@ -1,88 +1,81 @@
 import logging;
-import os;
-from configparser import SafeConfigParser
-from dateutil import parser
+from column import Column
+from column_fit import fit_boxes, ItemBox, overflow_text
+from fonts import FontConfig, font_registry
+from icon_atlas import icon_atlas
+from organizer_config import OrganizerConfig
 from PIL import ImageDraw, ImageFont
 from summary import Task
-from textwrap import wrap
-from typing import List
+from text_metrics import text_metrics
+from text_wrap import text_wrapper
+from typing import Iterator, List
 
 logger = logging.getLogger(__name__)
 
-class ActionListConfig(object):
+class ActionListConfig(FontConfig):
+    fonts = ('header_font', 'header_icon_font', 'body_font', 'body_icon_font')
 
-    def __init__(self):
-        self.parser = SafeConfigParser()
-        self.parser.sections()
-        found = self.parser.read('config/organizer.cfg')
-        if not found:
-            raise ValueError('No config file found!')
-        self.fontdir = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'font')
-    
     @property
     def header_font(self) -> ImageFont:
-        font = self.parser.get('action-list', 'header_font')
-        font_size = int(self.parser.get('action-list', 'header_font_size'))
-        return ImageFont.truetype(os.path.join(self.fontdir, f'{font}.ttf'), font_size)
+        return font_registry.get(self.config.font_path(self.config.action_list.font), self.config.action_list.font_size)
 
     @property
     def header_icon_font(self) -> ImageFont:
-        return ImageFont.truetype(os.path.join(self.fontdir, 'fa5-solid.otf'), 25)
+        return font_registry.get(self.config.font_path('fa5-solid', 'otf'), 25)
 
     @property
     def body_font(self) -> ImageFont:
-        font = self.parser.get('body', 'font')
-        font_size = int(self.parser.get('body', 'font_size'))
-        return ImageFont.truetype(os.path.join(self.fontdir, f'{font}.ttf'), font_size)
+        return font_registry.get(self.config.font_path(self.config.body.font), self.config.body.font_size)
 
     @property
     def body_icon_font(self) -> ImageFont:
-        return ImageFont.truetype(os.path.join(self.fontdir, 'fa5-regular.otf'), 15)
+        return font_registry.get(self.config.font_path('fa5-regular', 'otf'), 15)
 
-class ActionList(object):
+class ActionList(Column):
+    icon = '\uf0ae'
+    header_text = 'Action List'
 
-    def __init__(self, tasks: List[Task], box_start: tuple[int, int], box_end: tuple[int, int]):
-        self.config = ActionListConfig()
+    def __init__(self, tasks: List[Task], box_start: tuple[int, int], box_end: tuple[int, int], config: OrganizerConfig):
+        super().__init__(box_start, box_end)
+        self.config = ActionListConfig(config)
         self.tasks = tasks
-        self.box_start = box_start
-        self.box_end = box_end
 
-    def draw_header(self, image: ImageDraw) -> int:
-        icon = '\uf0ae'
-        header_text = 'Action List'
-        (x, y) = self.box_start
-        (max_x, max_y) = self.box_end
-        (icon_w, icon_h) = image.textsize(icon, font = self.config.header_icon_font)
-        (text_w, text_h) = image.textsize(header_text, font=self.config.header_font)
-        action_list_header_offset = x + int((max_x - x - text_w - icon_w - 10) / 2)
-        image.text((action_list_header_offset, y + 2), icon, font=self.config.header_icon_font)
-        image.text((action_list_header_offset + icon_w + 10, y), header_text, font=self.config.header_font)
-        
-        return y + text_h + 10
+    def measure_action_list(self, tasks: List[Task]) -> Iterator[ItemBox]:
+        (x, _) = self.box_start
+        (max_x, _) = self.box_end
+        for task in tasks:
+            icon = '\uf058 ' if task.complete else '\uf111 '
+            (task_bullet_w, _) = text_metrics.size(icon, self.config.body_icon_font)
+            formatted_summary = text_wrapper.wrap(task.summary, self.config.body_font, max_x - x - 8 - task_bullet_w)
+            lines = [(summary_line, *text_metrics.size(summary_line, self.config.body_font)) for summary_line in formatted_summary]
+            yield ItemBox(task, sum(4 + task_h for (_, _, task_h) in lines) + 6 + 1, lines)
 
-    def draw_action_list(self, image: ImageDraw, start_y: int) -> None:
+    def draw_body(self, image: ImageDraw, start_y: int) -> None:
         y = start_y
         (x, _) = self.box_start
-        (max_x, _) = self.box_end
-        for i, task in enumerate(self.tasks):
+        (max_x, max_y) = self.box_end
+        available = max_y - start_y
+        (_, overflow_h) = text_metrics.size(overflow_text(len(self.tasks)), self.config.body_font)
+        (visible, hidden) = fit_boxes(self.measure_action_list(self.tasks), len(self.tasks), available, 4 + overflow_h)
+        if hidden:
+            # Completed tasks are the first thing to give up space on a busy day
+            open_tasks = [task for task in self.tasks if not task.complete]
+            (visible, hidden) = fit_boxes(self.measure_action_list(open_tasks), len(open_tasks), available, 4 + overflow_h, len(self.tasks) - len(open_tasks))
+        for i, box in enumerate(visible):
+            task = box.item
             icon = '\uf058 ' if task.complete else '\uf111 '
-            formatted_summary = wrap(task.summary, width=32)
-            (task_bullet_w, _) = image.textsize(icon, font=self.config.body_icon_font)
-            for line, summary_line in enumerate(formatted_summary):
+            (task_bullet_w, _) = text_metrics.size(icon, self.config.body_icon_font)
+            for line, (summary_line, task_w, task_h) in enumerate(box.lines):
                 y += 4
-                (task_w, task_h) = image.textsize(summary_line, font=self.config.body_font)
                 if line == 0:
-                    image.text((x + 8, y + 2), icon, font=self.config.body_icon_font)
+                    icon_atlas.draw(image, (x + 8, y + 2), icon, self.config.body_icon_font)
                 image.text((x + task_bullet_w + 8, y), summary_line, font=self.config.body_font)
                 if task.complete:
                     image.rectangle([(x + task_bullet_w + 8, y + int(task_h / 2)), (x + task_bullet_w + 8 + task_w, y + int(task_h / 2) + 1)], fill = "#000000")
                 y += task_h
             y += 6
-            if i < len(self.tasks) - 1:
+            if i < len(visible) - 1 or hidden:
                 image.rectangle([(x, y), (max_x, y)], fill = "#000000")
                 y += 1
-
-    def render(self, black_image: ImageDraw, red_image: ImageDraw) -> None:
-        logger.info("Rendering")
-        body_y = self.draw_header(black_image)
-        self.draw_action_list(black_image, body_y)
+        if hidden:
+            image.text((x + 8, y + 4), overflow_text(hidden), font=self.config.body_font)
@@ -0,0 +1,9 @@
+import os
+from typing import Union
+
+# Write to a temporary file and rename it over the target, so a crash or power cut
+# mid-write leaves either the old file or the new one, never half of each
+def write_atomic(path: str, data: Union[bytes, str]) -> None:
+    with open(f'{path}.tmp', 'wb' if isinstance(data, bytes) else 'w') as output_file:
+        output_file.write(data)
+    os.replace(f'{path}.tmp', path)
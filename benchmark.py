@@ -0,0 +1,204 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from statistics import median
+from typing import List, Optional
+
+os.environ.setdefault('EPD_BACKEND', 'simulator')
+os.environ.setdefault('EPD_SIMULATOR_OUTPUT', '')
+libdir = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'lib')
+if os.path.exists(libdir):
+    sys.path.append(libdir)
+
+from dashboard import Dashboard
+from organizer_config import OrganizerConfig
+from power import PowerHelper
+from summary import Summary
+from waveshare_epd import epd7in5b_V2
+
+logger = logging.getLogger(__name__)
+
+FIXTURE_DAY = datetime.fromisoformat('2022-03-07T08:00:00-05:00')
+WEATHER_CONDITIONS = [1000, 1003, 1006, 1030, 1063, 1192, 1066, 1069, 1273]
+
+class FixedPowerHelper(PowerHelper):
+    def get_battery(self, refresh: bool = False) -> float:
+        return 64.0
+
+def meetings(count: int) -> list[dict]:
+    return [{
+        'startTime': (FIXTURE_DAY + timedelta(minutes=15 * i)).isoformat(),
+        'endTime': (FIXTURE_DAY + timedelta(minutes=15 * i + 30)).isoformat(),
+        'summary': f'Meeting {i}: quarterly planning sync with the platform team'
+    } for i in range(count)]
+
+def tasks(count: int, summary: str) -> list[dict]:
+    return [{ 'complete': i % 3 == 0, 'summary': f'{summary} #{i}' } for i in range(count)]
+
+def weather(count: int) -> list[dict]:
+    return [{
+        'time': (FIXTURE_DAY + timedelta(hours=i)).isoformat(),
+        'condition': WEATHER_CONDITIONS[i % len(WEATHER_CONDITIONS)],
+        'temperature': 40 + i,
+        'precipitation': (i * 7) % 100
+    } for i in range(count)]
+
+FIXTURES = {
+    'empty': { 'schedule': [], 'tasks': [], 'weather': [] },
+    'typical': { 'schedule': meetings(5), 'tasks': tasks(6, 'Review pull request'), 'weather': weather(4) },
+    'meetings_40': { 'schedule': meetings(40), 'tasks': tasks(6, 'Review pull request'), 'weather': weather(4) },
+    'long_tasks_60': { 'schedule': meetings(5), 'tasks': tasks(60, 'Write up the migration plan for the storage layer and circulate it to every stakeholder for sign-off'), 'weather': weather(4) },
+    'weather_24': { 'schedule': meetings(5), 'tasks': tasks(6, 'Review pull request'), 'weather': weather(24) },
+}
+
+def run_stages(data: str, config: OrganizerConfig, epd: epd7in5b_V2.EPD, power_helper: PowerHelper, measure) -> None:
+    summary = measure('decode', lambda: Summary.from_json(data))
+    dashboard = Dashboard(summary, epd.width, epd.height, power_helper, config)
+    for (name, stage) in dashboard.render_stages:
+        measure(name, stage)
+    measure('getbuffer', lambda: dashboard.getbuffers(epd))
+
+def benchmark_fixture(payload: dict, config: OrganizerConfig, iterations: int) -> dict:
+    data = json.dumps(payload)
+    epd = epd7in5b_V2.EPD()
+    power_helper = FixedPowerHelper()
+    timings = {}
+    peaks = {}
+
+    def time_stage(name, stage):
+        start = time.perf_counter()
+        result = stage()
+        timings.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+        return result
+
+    def trace_stage(name, stage):
+        tracemalloc.reset_peak()
+        (before, _) = tracemalloc.get_traced_memory()
+        result = stage()
+        (_, peak) = tracemalloc.get_traced_memory()
+        peaks[name] = max(peaks.get(name, 0), peak - before)
+        return result
+
+    # Warm up font and import caches so timings reflect steady-state rendering
+    run_stages(data, config, epd, power_helper, lambda name, stage: stage())
+    for _ in range(iterations):
+        run_stages(data, config, epd, power_helper, time_stage)
+    tracemalloc.start()
+    run_stages(data, config, epd, power_helper, trace_stage)
+    tracemalloc.stop()
+
+    return { name: {
+        'median_ms': round(median(values), 3),
+        'min_ms': round(min(values), 3),
+        'peak_kb': round(peaks[name] / 1024, 1)
+    } for (name, values) in timings.items() }
+
+def legacy_summary() -> type:
+    # The dataclasses_json models the decoder replaced, kept only to benchmark against
+    from dataclasses import dataclass
+    from dataclasses_json import dataclass_json, LetterCase
+
+    @dataclass_json(letter_case=LetterCase.CAMEL)
+    @dataclass
+    class Meeting:
+        start_time: str
+        end_time: str
+        summary: str
+
+    @dataclass_json(letter_case=LetterCase.CAMEL)
+    @dataclass
+    class Task:
+        complete: bool
+        summary: str
+
+    @dataclass_json(letter_case=LetterCase.CAMEL)
+    @dataclass
+    class Weather:
+        time: str
+        condition: int
+        temperature: int
+        precipitation: int
+
+    @dataclass_json(letter_case=LetterCase.CAMEL)
+    @dataclass
+    class LegacySummary:
+        schedule: Optional[List[Meeting]]
+        tasks: Optional[List[Task]]
+        weather: Optional[List[Weather]]
+
+    return LegacySummary
+
+def compare_decoders(iterations: int) -> None:
+    from dateutil import parser
+    legacy = legacy_summary()
+
+    def legacy_decode(data):
+        # Schedule and Footer used to parse every timestamp again on each draw
+        summary = legacy.from_json(data)
+        for meeting in summary.schedule:
+            parser.parse(meeting.start_time)
+        for weather in summary.weather:
+            parser.parse(weather.time)
+        return summary
+
+    print(f"{'fixture':<16}{'dataclasses_json':>18}{'decoder':>12}{'speedup':>10}")
+    for (name, payload) in FIXTURES.items():
+        data = json.dumps(payload)
+        medians = []
+        for decode in [legacy_decode, Summary.from_json]:
+            decode(data)
+            samples = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                decode(data)
+                samples.append((time.perf_counter() - start) * 1000)
+            medians.append(median(samples))
+        print(f"{name:<16}{medians[0]:>16.3f}ms{medians[1]:>10.3f}ms{medians[0] / medians[1]:>9.1f}x")
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for (fixture, stages) in results.items():
+        for (stage, result) in stages.items():
+            previous = baseline.get(fixture, {}).get(stage)
+            if previous is None:
+                continue
+            for metric in ['median_ms', 'peak_kb']:
+                if result[metric] > previous[metric] * (1 + tolerance) and result[metric] - previous[metric] > 0.5:
+                    regressions.append(f'{fixture}/{stage} {metric}: {previous[metric]} -> {result[metric]}')
+    return regressions
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description='Benchmark the render path against fixture payloads')
+    argument_parser.add_argument('--iterations', type=int, default=10)
+    argument_parser.add_argument('--fixture', action='append', choices=FIXTURES.keys(), help='Fixture to run, may be repeated (default: all)')
+    argument_parser.add_argument('--output', default='bench_results.json', help='Where to write the results')
+    argument_parser.add_argument('--baseline', help='Results file to compare against')
+    argument_parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed slowdown before a stage counts as a regression')
+    argument_parser.add_argument('--decoders', action='store_true', help='Compare the payload decoder against dataclasses_json instead (needs the dev packages)')
+    args = argument_parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.decoders:
+        compare_decoders(args.iterations)
+        sys.exit(0)
+
+    config = OrganizerConfig.load()
+    results = { name: benchmark_fixture(FIXTURES[name], config, args.iterations) for name in (args.fixture or FIXTURES.keys()) }
+    for (fixture, stages) in results.items():
+        print(fixture)
+        for (stage, result) in stages.items():
+            print(f"  {stage:<14}{result['median_ms']:>10.2f}ms{result['min_ms']:>10.2f}ms{result['peak_kb']:>10.1f}KB")
+    with open(args.output, 'w') as output_file:
+        json.dump(results, output_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,59 @@
+import hashlib
+import logging
+import os
+import PIL
+from atomic_file import write_atomic
+from frame_format import decode_frame, encode_frame
+from organizer_config import BASE_DIR, OrganizerConfig
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# The code that draws the chrome, hashed into the key so a deploy that changes it redraws the cache
+CHROME_MODULES = ['action_list.py', 'chrome_cache.py', 'column.py', 'dashboard.py', 'icon_atlas.py', 'layout.py', 'palette.py', 'schedule.py']
+
+class ChromeCache(object):
+
+    def __init__(self, path: str = 'cache/chrome.bin'):
+        self.path = path
+
+    def key(self, config: OrganizerConfig, size: tuple[int, int]) -> str:
+        digest = hashlib.sha256(f'{size[0]}x{size[1]}:{PIL.__version__}'.encode())
+        with open(config.path, 'rb') as config_file:
+            digest.update(config_file.read())
+        for module in CHROME_MODULES:
+            with open(os.path.join(BASE_DIR, module), 'rb') as module_file:
+                digest.update(module_file.read())
+        # Stat rather than hash the fonts: they are large and only change when replaced
+        for entry in sorted(os.scandir(config.fontdir), key=lambda entry: entry.name):
+            stat = entry.stat()
+            digest.update(f'{entry.name}:{stat.st_size}:{stat.st_mtime_ns}'.encode())
+        return digest.hexdigest()
+
+    def load(self, key: str, size: tuple[int, int]) -> Optional[bytes]:
+        try:
+            with open(self.path, 'rb') as chrome_file:
+                if chrome_file.readline().decode().strip() != key:
+                    logger.info("Static chrome was drawn for another config or font set, redrawing it")
+                    return None
+                (header, planes) = decode_frame(chrome_file.read())
+        except IOError:
+            logger.info("Static chrome cache did not exist")
+            return None
+        except ValueError as e:
+            logger.info(f"Static chrome cache is unreadable, redrawing it: {e}")
+            return None
+        if (header.width, header.height, len(planes)) != (*size, 1):
+            logger.info("Static chrome cache has a different size, redrawing it")
+            return None
+        return planes[0]
+
+    def save(self, key: str, data: bytes, size: tuple[int, int]) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            write_atomic(self.path, f'{key}\n'.encode() + encode_frame([data], *size))
+        except IOError as e:
+            logger.warning(f"Could not cache static chrome: {e}")
+
+# Shared so every render in a process reuses the same cache file
+chrome_cache = ChromeCache()
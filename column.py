@@ -0,0 +1,42 @@
+import logging;
+from icon_atlas import icon_atlas
+from PIL import ImageDraw
+from text_metrics import text_metrics
+
+logger = logging.getLogger(__name__)
+
+class Column(object):
+    # Subclasses set these, and a config with header_font and header_icon_font
+    icon = ''
+    header_text = ''
+
+    def __init__(self, box_start: tuple[int, int], box_end: tuple[int, int]):
+        self.box_start = box_start
+        self.box_end = box_end
+
+    @property
+    def body_start(self) -> int:
+        (_, y) = self.box_start
+        (_, text_h) = text_metrics.size(self.header_text, self.config.header_font)
+        return y + text_h + 10
+
+    def draw_header(self, image: ImageDraw) -> int:
+        (x, y) = self.box_start
+        (max_x, _) = self.box_end
+        (icon_w, _) = text_metrics.size(self.icon, self.config.header_icon_font)
+        (text_w, _) = text_metrics.size(self.header_text, self.config.header_font)
+        header_offset = x + int((max_x - x - text_w - icon_w - 10) / 2)
+        icon_atlas.draw(image, (header_offset, y + 2), self.icon, self.config.header_icon_font)
+        image.text((header_offset + icon_w + 10, y), self.header_text, font=self.config.header_font)
+
+        return self.body_start
+
+    def draw_body(self, image: ImageDraw, start_y: int) -> None:
+        raise NotImplementedError
+
+    # The column header is static, so the dashboard can leave it to the cached chrome
+    def render(self, black_image: ImageDraw, red_image: ImageDraw, include_header: bool = True) -> None:
+        logger.info(f"Rendering {self.header_text}")
+        if include_header:
+            self.draw_header(black_image)
+        self.draw_body(black_image, self.body_start)
@@ -0,0 +1,29 @@
+from dataclasses import dataclass, field
+from typing import Any, Iterable, List
+
+@dataclass
+class ItemBox:
+    item: Any
+    height: int
+    lines: List[tuple[str, int, int]] = field(default_factory=list)
+
+def fit_boxes(boxes: Iterable[ItemBox], count: int, available: int, overflow_height: int, dropped: int = 0) -> tuple[List[ItemBox], int]:
+    # Boxes are consumed lazily, so items past the first one that overflows are never measured.
+    # dropped counts items the caller already left out of boxes, which the "+N more" line includes.
+    visible = []
+    used = 0
+    for box in boxes:
+        if used + box.height > available:
+            break
+        visible.append(box)
+        used += box.height
+    else:
+        if not dropped:
+            return (visible, 0)
+    # Leave room for the "+N more" line after the last box that fits
+    while visible and used + overflow_height > available:
+        used -= visible.pop().height
+    return (visible, count - len(visible) + dropped)
+
+def overflow_text(hidden: int) -> str:
+    return f"+{hidden} more"
@@ -0,0 +1,83 @@
+import logging
+import signal
+import threading
+from datetime import datetime
+from frame_diff import FrameStore
+from updater import create_epd, create_update_fetcher, next_wake_time, run_once, update, update_from_farm
+from organizer_config import OrganizerConfig
+from power import PowerHelper
+from timing import timer
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+class OrganizerDaemon(object):
+
+    def __init__(self, poll_interval: int = 300, profile: Optional[str] = None):
+        self.poll_interval = poll_interval
+        self.profile = profile
+        self.config = OrganizerConfig.load()
+        # Kept for the life of the process so fonts, the GCS client and the EPD handle stay warm
+        self.fetcher = create_update_fetcher(profile)
+        self.epd = create_epd()
+        self.power_helper = PowerHelper()
+        self.frame_store = FrameStore()
+        self.wakeup = threading.Event()
+        self.stopping = False
+        self.reload_requested = False
+
+    def handle_sigterm(self, signum, frame) -> None:
+        logger.info("Received SIGTERM, stopping")
+        self.stopping = True
+        self.wakeup.set()
+
+    def handle_sighup(self, signum, frame) -> None:
+        logger.info("Received SIGHUP, reloading config")
+        self.reload_requested = True
+        self.wakeup.set()
+
+    def reload(self) -> None:
+        self.reload_requested = False
+        try:
+            self.config = OrganizerConfig.load()
+        except ValueError as e:
+            logger.error(f"Keeping previous config: {e}")
+
+    def cycle(self, at_slot: bool) -> None:
+        timer.reset()
+        self.power_helper.get_battery(refresh=True)
+        # Between slots only a changed payload is drawn; the header-only refresh waits for the slot
+        if self.profile:
+            render = update_from_farm(self.config, self.fetcher, self.profile, self.frame_store, self.epd)
+        else:
+            render = update(self.config, self.fetcher, self.power_helper, self.frame_store, self.epd, header_only=at_slot)
+        timer.write(battery=self.power_helper.get_battery(), rendered=render)
+
+    def run(self) -> None:
+        if self.power_helper.get_battery() >= 0:
+            logger.info("On battery power so running once and shutting down")
+            self.power_helper.close()
+            run_once(self.profile)
+            return
+
+        signal.signal(signal.SIGTERM, self.handle_sigterm)
+        signal.signal(signal.SIGHUP, self.handle_sighup)
+        logger.info(f"Running resident, polling every {self.poll_interval}s")
+        next_slot = datetime.now()
+        while not self.stopping:
+            if self.reload_requested:
+                self.reload()
+            now = datetime.now()
+            at_slot = now >= next_slot
+            try:
+                self.cycle(at_slot)
+            # A bad payload or frame, or a failed download, should cost one cycle rather than the process
+            except Exception:
+                logger.exception("Update failed, retrying at the next poll")
+            if at_slot:
+                next_slot = next_wake_time(now)
+                logger.info(f"Next scheduled update at {next_slot.isoformat()}")
+            self.wakeup.wait(max(0, min(self.poll_interval, (next_slot - datetime.now()).total_seconds())))
+            self.wakeup.clear()
+        self.power_helper.close()
+        logger.info("Stopped")
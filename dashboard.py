@@ -1,27 +1,48 @@
 import logging;
 from action_list import ActionList
+from chrome_cache import chrome_cache
+from fonts import font_registry
 from footer import Footer
 from header import Header
+from icon_atlas import icon_atlas
 from layout import Layout
+from organizer_config import OrganizerConfig
+from palette import new_canvas, RedDraw
 from PIL import Image, ImageDraw
 from power import PowerHelper
 from schedule import Schedule
 from summary import Summary
+from text_metrics import text_metrics
+from tiles import render_tiles
+from timing import timer
+from typing import Callable
 
 logger = logging.getLogger(__name__)
 
 class Dashboard(object):
 
-    def __init__(self, summary: Summary, width: int, height: int, power_helper: PowerHelper):
-        self.blackimg = Image.new('1', (width, height), 255)
-        self.draw_blackimg = ImageDraw.Draw(self.blackimg)
-        self.redimg = Image.new('1', (width, height), 255)
-        self.draw_redimg = ImageDraw.Draw(self.redimg)
-        self._layout = Layout(width, height)
-        self.header = Header(self.layout, power_helper)
-        self.schedule = Schedule(summary.schedule, self.layout.left_column_start, self.layout.left_column_end)
-        self.action_list = ActionList(summary.tasks, self.layout.right_column_start, self.layout.right_column_end)
-        self.footer = Footer(summary.weather, self.layout.footer_start, self.layout.footer_end)
+    def __init__(self, summary: Summary, width: int, height: int, power_helper: PowerHelper, config: OrganizerConfig = None):
+        if config is None:
+            with timer.span('config'):
+                config = OrganizerConfig.load()
+        self.config = config
+        if self.config.display.palette_canvas:
+            self.canvas = new_canvas(width, height)
+            self.draw_blackimg = ImageDraw.Draw(self.canvas)
+            self.draw_redimg = RedDraw(self.draw_blackimg)
+        else:
+            self.canvas = None
+            self.blackimg = Image.new('1', (width, height), 255)
+            self.draw_blackimg = ImageDraw.Draw(self.blackimg)
+            self.redimg = Image.new('1', (width, height), 255)
+            self.draw_redimg = ImageDraw.Draw(self.redimg)
+        self._layout = Layout(width, height, self.config)
+        self.header = Header(self.layout, power_helper, self.config)
+        self.schedule = Schedule(summary.schedule, self.layout.left_column_start, self.layout.left_column_end, self.config)
+        self.action_list = ActionList(summary.tasks, self.layout.right_column_start, self.layout.right_column_end, self.config)
+        self.footer = Footer(summary.weather, self.layout.footer_start, self.layout.footer_end, self.config)
+        for component in [self.header, self.schedule, self.action_list, self.footer]:
+            component.config.preload()
 
     @property
     def black(self) -> ImageDraw:
@@ -35,10 +56,83 @@ class Dashboard(object):
     def layout(self) -> Layout:
         return self._layout
 
-    def render(self) -> tuple[Image, Image]:
+    @property
+    def excluded_regions(self) -> list[tuple[int, int, int, int]]:
+        return self.header.excluded_regions
+
+    @property
+    def header_region(self) -> tuple[int, int, int, int]:
+        return (0, 0, self.layout.width, self.config.header.height)
+
+    @property
+    def stages(self) -> list[tuple[str, Callable[[], None]]]:
+        return [
+            ('chrome', self.render_chrome),
+            ('header', lambda: self.header.render(self.black, self.red)),
+            ('schedule', lambda: self.schedule.render(self.black, self.red, include_header=False)),
+            ('action_list', lambda: self.action_list.render(self.black, self.red, include_header=False)),
+            ('footer', lambda: self.footer.render(self.black, self.red)),
+        ]
+
+    @property
+    def base_image(self) -> Image:
+        return self.canvas if self.canvas is not None else self.blackimg
+
+    @property
+    def images(self) -> list[Image]:
+        return [self.canvas] if self.canvas is not None else [self.blackimg, self.redimg]
+
+    # Where each component draws, for rendering them as separate tiles. These do not overlap.
+    @property
+    def regions(self) -> dict[str, tuple[int, int, int, int]]:
+        return {
+            'header': self.header_region,
+            'schedule': (*self.layout.left_column_start, self.layout.left_column_end[0] + 1, self.layout.left_column_end[1] + 1),
+            'action_list': (*self.layout.right_column_start, self.layout.right_column_end[0] + 1, self.layout.right_column_end[1] + 1),
+            'footer': (0, self.layout.footer_start[1], self.layout.width, self.layout.height),
+        }
+
+    # Everything that only changes with the config or fonts: the layout and the column headers.
+    # It is all black and white, so it is cached as a single packed plane.
+    def render_chrome(self) -> None:
+        image = self.base_image
+        rawmode = 'P;1' if image.mode == 'P' else '1'
+        key = chrome_cache.key(self.config, image.size)
+        chrome = chrome_cache.load(key, image.size)
+        if chrome is not None:
+            image.paste(Image.frombytes(image.mode, image.size, chrome, 'raw', rawmode))
+            return
         self.layout.render(self.black)
-        self.header.render(self.black, self.red)
-        self.schedule.render(self.black, self.red)
-        self.action_list.render(self.black, self.red)
-        self.footer.render(self.blackimg, self.red)
-        return (self.blackimg, self.redimg)
+        self.schedule.draw_header(self.black)
+        self.action_list.draw_header(self.black)
+        chrome_cache.save(key, image.tobytes('raw', rawmode), image.size)
+
+    # Draw only the header bar, for status-only updates through a partial window refresh
+    def render_header(self) -> None:
+        for (name, stage) in [('layout', lambda: self.layout.draw_header(self.black)), ('header', lambda: self.header.render(self.black, self.red))]:
+            with timer.span(f'render.{name}'):
+                stage()
+        icon_atlas.save()
+
+    # The stages as render runs them: with worker processes, the components with a region become one 'tiles' stage
+    @property
+    def render_stages(self) -> list[tuple[str, Callable[[], None]]]:
+        workers = self.config.display.render_workers
+        if workers <= 1:
+            return self.stages
+        tiled = [name for (name, _) in self.stages if name in self.regions]
+        stages = [(name, stage) for (name, stage) in self.stages if name not in self.regions]
+        return stages + [('tiles', lambda: render_tiles(self, tiled, workers))]
+
+    def render(self) -> None:
+        for (name, stage) in self.render_stages:
+            with timer.span(f'render.{name}'):
+                stage()
+        icon_atlas.save()
+        font_registry.log_stats()
+        text_metrics.log_stats()
+
+    def getbuffers(self, epd) -> tuple[bytearray, bytearray]:
+        if self.canvas is not None:
+            return epd.getbuffers(self.canvas, red=self.draw_redimg.drawn)
+        return (epd.getbuffer(self.blackimg), epd.getbuffer(self.redimg))
@@ -0,0 +1,50 @@
+import logging
+import time
+from organizer_config import OrganizerConfig
+from PIL import ImageFont
+
+logger = logging.getLogger(__name__)
+
+class FontRegistry(object):
+
+    def __init__(self):
+        self._fonts = {}
+        self.loads = 0
+        self.hits = 0
+        self.load_seconds = 0.0
+
+    def get(self, path: str, size: int) -> ImageFont:
+        key = (path, size)
+        font = self._fonts.get(key)
+        if font is not None:
+            self.hits += 1
+            return font
+        start = time.perf_counter()
+        font = ImageFont.truetype(path, size)
+        self.load_seconds += time.perf_counter() - start
+        self.loads += 1
+        self._fonts[key] = font
+        return font
+
+    @property
+    def saved_seconds(self) -> float:
+        if self.loads == 0:
+            return 0.0
+        return self.hits * self.load_seconds / self.loads
+
+    def log_stats(self) -> None:
+        logger.info(f"Fonts: {self.loads} files loaded in {self.load_seconds * 1000:.1f}ms, {self.hits} cache hits saved ~{self.saved_seconds * 1000:.1f}ms")
+
+# Configs look fonts up by path and size, so the same face at the same size is parsed once per process
+font_registry = FontRegistry()
+
+class FontConfig(object):
+    # Names of the font properties a component draws with, so the dashboard can load them all up front
+    fonts: tuple[str, ...] = ()
+
+    def __init__(self, config: OrganizerConfig):
+        self.config = config
+
+    def preload(self) -> None:
+        for font in self.fonts:
+            getattr(self, font)
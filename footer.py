@@ -1,79 +1,65 @@
 import logging;
-import os;
-from configparser import SafeConfigParser
-from dateutil import parser
+from fonts import FontConfig, font_registry
 from functools import reduce
+from icon_atlas import icon_atlas
+from organizer_config import OrganizerConfig
 from PIL import Image, ImageDraw, ImageFont
 from summary import Weather
-from textwrap import wrap
+from text_metrics import text_metrics
 from typing import List
 
 logger = logging.getLogger(__name__)
 
-class FooterConfig(object):
+# Weather API condition codes grouped by the icon that represents them
+WEATHER_ICON_GROUPS = [
+    ("\uf185", [ 1000 ]), # Sunny
+    ("\uf6c4", [ 1003 ]), # Partly cloudy
+    ("\uf0c2", [ 1006, 1009 ]), # Cloudy, Overcast
+    ("\uf75f", [ 1030, 1135, 1147 ]), # Mist, Fog, Freezing fog
+    ("\uf73d", [ 1063, 1150, 1153, 1180, 1183, 1186, 1189, 1240 ]), # Patchy rain possible, Patchy light drizzle, Light drizzle, Patchy light rain, Light rain, Moderate rain at times, Moderate rain, Light rain shower
+    ("\uf740", [ 1192, 1195, 1243, 1246 ]), # Heavy rain at times, Heavy rain, Moderate or heavy rain shower, Torrential rain shower
+    ("\uf2dc", [ 1066, 1114, 1117, 1210, 1213, 1216, 1219, 1222, 1225, 1255, 1258 ]), # Patchy snow possible, Blowing snow, Blizzard, Patchy light snow, Light snow, Patchy moderate snow, Moderate snow, Patchy heavy snow, Heavy snow, Light snow showers, Moderate or heavy snow showers
+    ("\uf7ad", [ 1069, 1072, 1087, 1168, 1171, 1198, 1201, 1204, 1207, 1237, 1249, 1252, 1261, 1264 ]), # Patchy sleet possible, Patchy freezing drizzle possible, Freezing drizzle, Heavy freezing drizzle, Light freezing rain, Moderate or heavy freezing rain, Light sleet,  Moderate or heavy sleet, Ice pellets, Light sleet showers, Moderate or heavy sleet showers, Light showers of ice pellets, Moderate or heavy showers of ice pellets
+    ("\uf0e7", [ 1087, 1273, 1276, 1279, 1282 ]), # Thundery outbreaks possible, Patchy light rain with thunder, Moderate or heavy rain with thunder, Patchy light snow with thunder, Moderate or heavy snow with thunder
+]
+
+# 1087 is listed twice; building from the last group back lets the earlier one win, as it did in the old if/elif chain
+WEATHER_ICONS = { condition: icon for (icon, conditions) in reversed(WEATHER_ICON_GROUPS) for condition in conditions }
+
+class FooterConfig(FontConfig):
+    fonts = ('header_font', 'body_font', 'weather_icon_font')
 
-    def __init__(self):
-        self.parser = SafeConfigParser()
-        self.parser.sections()
-        found = self.parser.read('config/organizer.cfg')
-        if not found:
-            raise ValueError('No config file found!')
-        self.fontdir = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'font')
-    
     @property
     def header_font(self) -> ImageFont:
-        font = self.parser.get('footer', 'header_font')
-        font_size = int(self.parser.get('footer', 'header_font_size'))
-        return ImageFont.truetype(os.path.join(self.fontdir, f'{font}.ttf'), font_size)
+        return font_registry.get(self.config.font_path(self.config.footer.font), self.config.footer.font_size)
     
     @property
     def body_font(self) -> ImageFont:
-        font = self.parser.get('body', 'font')
-        font_size = int(self.parser.get('body', 'font_size'))
-        return ImageFont.truetype(os.path.join(self.fontdir, f'{font}.ttf'), font_size)
+        return font_registry.get(self.config.font_path(self.config.body.font), self.config.body.font_size)
 
     @property
     def weather_icon_font(self) -> ImageFont:
-        return ImageFont.truetype(os.path.join(self.fontdir, 'fa5-solid.otf'), 15)
+        return font_registry.get(self.config.font_path('fa5-solid', 'otf'), 15)
 
 class Footer(object):
 
-    def __init__(self, weather: List[Weather], box_start: tuple[int, int], box_end: tuple[int, int]):
-        self.config = FooterConfig()
+    def __init__(self, weather: List[Weather], box_start: tuple[int, int], box_end: tuple[int, int], config: OrganizerConfig):
+        self.config = FooterConfig(config)
         self.weather = weather
         self.box_start = box_start
         self.box_end = box_end
 
-    def draw_weather(self, weather: Weather, black_image: Image, red_image: ImageDraw) -> Image:
-        icon = ""
-        if weather.condition == 1000: # Sunny
-            icon = "\uf185"
-        elif weather.condition == 1003: # Partly cloudy
-            icon = "\uf6c4"
-        elif weather.condition in [ 1006, 1009 ]: # Cloudy, Overcast
-            icon = "\uf0c2"
-        elif weather.condition in [ 1030, 1135, 1147 ]: # Mist, Fog, Freezing fog
-            icon = "\uf75f"
-        elif weather.condition in [ 1063, 1150, 1153, 1180, 1183, 1186, 1189, 1240 ]: # Patchy rain possible, Patchy light drizzle, Light drizzle, Patchy light rain, Light rain, Moderate rain at times, Moderate rain, Light rain shower
-            icon = "\uf73d"
-        elif weather.condition in [ 1192, 1195, 1243, 1246,  ]: # Heavy rain at times, Heavy rain, Moderate or heavy rain shower, Torrential rain shower
-            icon = "\uf740"
-        elif weather.condition in [ 1066, 1114, 1117, 1210, 1213, 1216, 1219, 1222, 1225, 1255, 1258 ]: # Patchy snow possible, Blowing snow, Blizzard, Patchy light snow, Light snow, Patchy moderate snow, Moderate snow, Patchy heavy snow, Heavy snow, Light snow showers, Moderate or heavy snow showers
-            icon = "\uf2dc"
-        elif weather.condition in [ 1069, 1072, 1087, 1168, 1171, 1198, 1201, 1204, 1207, 1237, 1249, 1252, 1261, 1264 ]: # Patchy sleet possible, Patchy freezing drizzle possible, Freezing drizzle, Heavy freezing drizzle, Light freezing rain, Moderate or heavy freezing rain, Light sleet,  Moderate or heavy sleet, Ice pellets, Light sleet showers, Moderate or heavy sleet showers, Light showers of ice pellets, Moderate or heavy showers of ice pellets
-            icon = "\uf7ad"
-        elif weather.condition in [ 1087, 1273, 1276, 1279, 1282 ] : # Thundery outbreaks possible, Patchy light rain with thunder, Moderate or heavy rain with thunder, Patchy light snow with thunder, Moderate or heavy snow with thunder
-            icon = "\uf0e7"
-
-        time = parser.parse(weather.time).strftime("%H:%M")
+    def draw_weather(self, weather: Weather, black_image: ImageDraw, red_image: ImageDraw) -> Image:
+        icon = WEATHER_ICONS.get(weather.condition, "")
+        time = weather.time.strftime("%H:%M")
         temperature = f" | {weather.temperature}\u00B0 | "
         precipitation_icon = "\uf043"
         precipitation = f"{weather.precipitation}%"
-        (time_w, time_h) = red_image.textsize(time, font=self.config.header_font)
-        (icon_w, icon_h) = red_image.textsize(icon, font = self.config.weather_icon_font)
-        (temp_w, temp_h) = red_image.textsize(temperature, font=self.config.body_font)
-        (precip_icon_w, precip_icon_h) = red_image.textsize(precipitation_icon, font = self.config.weather_icon_font)
-        (precip_w, precip_h) = red_image.textsize(precipitation, font=self.config.body_font)
+        (time_w, time_h) = text_metrics.size(time, self.config.header_font)
+        (icon_w, icon_h) = text_metrics.size(icon, self.config.weather_icon_font)
+        (temp_w, temp_h) = text_metrics.size(temperature, self.config.body_font)
+        (precip_icon_w, precip_icon_h) = text_metrics.size(precipitation_icon, self.config.weather_icon_font)
+        (precip_w, precip_h) = text_metrics.size(precipitation, self.config.body_font)
 
         image_width = (icon_w + temp_w + precip_icon_w + 4 + precip_w)
         image_height = (time_h + 5 + max(icon_h, temp_h, precip_icon_h, precip_h) + 2)
@@ -84,30 +70,31 @@ class Footer(object):
         time_offset = int((image_width - time_w) / 2)
         draw_image.text((time_offset, y), time, font=self.config.header_font, fill="#ffffff")
         y += time_h + 5
-        draw_image.text((x, y + 2), icon, font=self.config.weather_icon_font, fill="#ffffff")
+        icon_atlas.draw(draw_image, (x, y + 2), icon, self.config.weather_icon_font, fill="#ffffff")
         x += icon_w
         draw_image.text((x, y), temperature, font=self.config.body_font, fill="#ffffff")
         x += temp_w
-        draw_image.text((x, y + 2), precipitation_icon, font=self.config.weather_icon_font, fill="#ffffff")
+        icon_atlas.draw(draw_image, (x, y + 2), precipitation_icon, self.config.weather_icon_font, fill="#ffffff")
         x += precip_icon_w + 4
         draw_image.text((x, y), precipitation, font=self.config.body_font, fill="#ffffff")
 
         return image
 
-    def draw_weather_forecast(self, black_image: Image, red_image: ImageDraw) -> None:
+    def draw_weather_forecast(self, black_image: ImageDraw, red_image: ImageDraw) -> None:
         weather_images = list(map(lambda weather: self.draw_weather(weather, black_image, red_image), self.weather))
         weather_forecast_w = reduce(lambda acc, weather: acc + weather.width, weather_images, 0) + (len(self.weather) - 1) * 41
         (_, y) = self.box_start
         (max_x, max_y) = self.box_end
         x = int((max_x - weather_forecast_w) / 2)
-        draw_image = ImageDraw.Draw(black_image)
         for i, image in enumerate(weather_images):
             if i != 0:
                 x += image.width + 20
-                draw_image.rectangle([x, y, x, max_y], fill="#FFFFFF")
+                black_image.rectangle([x, y, x, max_y], fill="#FFFFFF")
                 x += 21
-            black_image.paste(image, (x, y))
+            # Same result as pasting the tile, but works on the palette canvas too
+            black_image.rectangle([x, y, x + image.width - 1, y + image.height - 1], fill="#000000")
+            black_image.bitmap((x, y), image, fill="#FFFFFF")
         
-    def render(self, black_image: Image, red_image: ImageDraw) -> None:
+    def render(self, black_image: ImageDraw, red_image: ImageDraw) -> None:
         logger.info("Rendering")
         self.draw_weather_forecast(black_image, red_image)
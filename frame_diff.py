@@ -0,0 +1,96 @@
+import logging
+import os
+from atomic_file import write_atomic
+from frame_format import decode_frame, encode_frame
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+SKIP = 'skip'
+PARTIAL = 'partial'
+FULL = 'full'
+
+class FrameStore(object):
+
+    def __init__(self, path: str = 'last_frame.bin'):
+        self.path = path
+
+    def load(self, width: int, height: int) -> Optional[tuple[bytes, bytes]]:
+        try:
+            with open(self.path, 'rb') as frame_file:
+                (header, planes) = decode_frame(frame_file.read())
+        except IOError:
+            logger.info("Stored frame did not exist")
+            return None
+        except ValueError as e:
+            logger.info(f"Stored frame is unreadable, ignoring it: {e}")
+            return None
+        if (header.width, header.height, len(planes)) != (width, height, 2):
+            logger.info("Stored frame has a different size, ignoring it")
+            return None
+        return (planes[0], planes[1])
+
+    def save(self, black: bytes, red: bytes, width: int, height: int) -> None:
+        write_atomic(self.path, encode_frame([black, red], width, height))
+
+    # For when the panel is refreshed without a stored copy, so later diffs do not use an outdated frame
+    def discard(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+def splice_window(previous: bytes, current: bytes, width: int, window: tuple[int, int, int, int]) -> bytes:
+    row_bytes = int(width / 8)
+    (x_start, y_start, x_end, y_end) = window
+    (start, end) = (int(x_start / 8), int((x_end + 7) / 8))
+    spliced = bytearray(previous)
+    for y in range(y_start, y_end):
+        spliced[y * row_bytes + start:y * row_bytes + end] = current[y * row_bytes + start:y * row_bytes + end]
+    return bytes(spliced)
+
+def changed_bytes(previous: bytes, current: bytes) -> bytes:
+    # XOR the planes as big integers so the whole 48 KB compare runs in C
+    return (int.from_bytes(previous, 'big') ^ int.from_bytes(current, 'big')).to_bytes(len(current), 'big')
+
+def changed_regions(previous: tuple[bytes, bytes], current: tuple[bytes, bytes], width: int, merge_gap: int = 8) -> List[tuple[int, int, int, int]]:
+    row_bytes = int(width / 8)
+    diffs = [changed_bytes(bytes(before), bytes(after)) for (before, after) in zip(previous, current)]
+    height = int(len(diffs[0]) / row_bytes)
+    regions = []
+    for y in range(height):
+        left = row_bytes
+        right = 0
+        for diff in diffs:
+            row = diff[y * row_bytes:(y + 1) * row_bytes]
+            stripped = row.rstrip(b'\x00')
+            if stripped:
+                left = min(left, len(stripped) - len(stripped.lstrip(b'\x00')))
+                right = max(right, len(stripped))
+        if right == 0:
+            continue
+        # Rows close to the previous band are merged into it so text lines form one box
+        if regions and y - regions[-1][3] <= merge_gap:
+            (x_start, y_start, x_end, _) = regions[-1]
+            regions[-1] = (min(x_start, left * 8), y_start, max(x_end, right * 8), y + 1)
+        else:
+            regions.append((left * 8, y, right * 8, y + 1))
+    return regions
+
+def union(regions: List[tuple[int, int, int, int]]) -> tuple[int, int, int, int]:
+    return (min(r[0] for r in regions), min(r[1] for r in regions), max(r[2] for r in regions), max(r[3] for r in regions))
+
+# always_include covers areas masked out of the diff, such as the header clock, which should
+# not cause a refresh by themselves but must be redrawn whenever anything else is
+def plan_update(previous: Optional[tuple[bytes, bytes]], current: tuple[bytes, bytes], width: int, height: int, max_partial_area: float, always_include: Optional[List[tuple[int, int, int, int]]] = None) -> tuple[str, Optional[tuple[int, int, int, int]]]:
+    if previous is None:
+        return (FULL, None)
+    regions = changed_regions(previous, current, width)
+    if not regions:
+        return (SKIP, None)
+    window = union(regions + list(always_include or []))
+    area = (window[2] - window[0]) * (window[3] - window[1])
+    logger.info(f"Changed regions {regions} cover {area / (width * height):.1%} of the panel")
+    if area <= max_partial_area * width * height:
+        return (PARTIAL, window)
+    return (FULL, None)
@@ -0,0 +1,78 @@
+import struct
+import zlib
+from dataclasses import dataclass
+from typing import Iterator
+
+# Container for packed display planes, as written to the frame caches and by the render farm:
+#   header: magic, version, orientation, width, height, plane count, CRC-32 of everything after it
+#   then the compressed length of each plane, then each plane as its own zlib stream
+MAGIC = b'EPDF'
+VERSION = 1
+LANDSCAPE = 0
+PORTRAIT = 1
+HEADER = struct.Struct('<4sBBHHBI')
+PLANE_LENGTH = struct.Struct('<I')
+# Matches the spidev transfer size in the display driver
+CHUNK_SIZE = 4096
+
+@dataclass
+class FrameHeader:
+    version: int
+    orientation: int
+    width: int
+    height: int
+    plane_lengths: list[int]
+
+    @property
+    def plane_size(self) -> int:
+        return int(self.width / 8) * self.height
+
+    @property
+    def size(self) -> int:
+        return HEADER.size + PLANE_LENGTH.size * len(self.plane_lengths)
+
+    def plane_offset(self, index: int) -> int:
+        return self.size + sum(self.plane_lengths[:index])
+
+def encode_frame(planes: list[bytes], width: int, height: int, orientation: int = LANDSCAPE) -> bytes:
+    # Frames are mostly white, so even the fastest level shrinks a plane about tenfold
+    compressed = [zlib.compress(bytes(plane), 1) for plane in planes]
+    body = b''.join(PLANE_LENGTH.pack(len(plane)) for plane in compressed) + b''.join(compressed)
+    return HEADER.pack(MAGIC, VERSION, orientation, width, height, len(planes), zlib.crc32(body)) + body
+
+def read_header(data: bytes) -> FrameHeader:
+    if len(data) < HEADER.size:
+        raise ValueError(f"Frame is only {len(data)} bytes")
+    (magic, version, orientation, width, height, planes, checksum) = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a packed frame")
+    if version != VERSION:
+        raise ValueError(f"Frame version {version} is not supported")
+    # Checked before anything is decoded, so a damaged frame never reaches the panel
+    if zlib.crc32(memoryview(data)[HEADER.size:]) != checksum:
+        raise ValueError("Frame checksum does not match")
+    lengths = [PLANE_LENGTH.unpack_from(data, HEADER.size + PLANE_LENGTH.size * i)[0] for i in range(planes)]
+    return FrameHeader(version, orientation, width, height, lengths)
+
+def iter_plane(data: bytes, header: FrameHeader, index: int, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    # Decompress a plane a chunk at a time, for sending to the panel without holding the whole plane
+    start = header.plane_offset(index)
+    pending = memoryview(data)[start:start + header.plane_lengths[index]]
+    decompressor = zlib.decompressobj()
+    size = 0
+    while pending or not decompressor.eof:
+        try:
+            chunk = decompressor.decompress(pending, chunk_size)
+        except zlib.error as e:
+            raise ValueError(f"Plane {index} is not a valid zlib stream: {e}") from e
+        pending = decompressor.unconsumed_tail
+        if not chunk:
+            break
+        size += len(chunk)
+        yield chunk
+    if size != header.plane_size or not decompressor.eof:
+        raise ValueError(f"Plane {index} decoded to {size} bytes, expected {header.plane_size}")
+
+def decode_frame(data: bytes) -> tuple[FrameHeader, list[bytes]]:
+    header = read_header(data)
+    return (header, [b''.join(iter_plane(data, header, index)) for index in range(len(header.plane_lengths))])
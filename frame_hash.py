@@ -0,0 +1,40 @@
+import hashlib
+import logging
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+def blank_regions(plane: bytes, width: int, regions: Optional[List[tuple[int, int, int, int]]]) -> bytes:
+    if not regions:
+        return plane
+    row_bytes = int(width / 8)
+    height = int(len(plane) / row_bytes)
+    masked = bytearray(plane)
+    for (left, top, right, bottom) in regions:
+        start_byte = max(0, int(left / 8))
+        end_byte = min(row_bytes, int((right + 7) / 8))
+        if end_byte <= start_byte:
+            continue
+        blank = b'\xff' * (end_byte - start_byte)
+        for y in range(max(0, top), min(height, bottom)):
+            offset = y * row_bytes
+            masked[offset + start_byte:offset + end_byte] = blank
+    return bytes(masked)
+
+def frame_digest(black: bytes, red: bytes, width: int, excluded_regions: Optional[List[tuple[int, int, int, int]]] = None) -> str:
+    digest = hashlib.sha256()
+    digest.update(blank_regions(bytes(black), width, excluded_regions))
+    digest.update(blank_regions(bytes(red), width, excluded_regions))
+    return digest.hexdigest()
+
+def read_last_digest(path: str = 'last_frame.txt') -> Optional[str]:
+    try:
+        with open(path, 'r') as last_frame_file:
+            return last_frame_file.readline().strip() or None
+    except IOError:
+        logger.info("Last frame file did not exist")
+        return None
+
+def write_last_digest(digest: str, path: str = 'last_frame.txt') -> None:
+    with open(path, 'w') as last_frame_file:
+        last_frame_file.write(digest)
@@ -0,0 +1,51 @@
+import hashlib
+import json
+from frame_format import decode_frame, FrameHeader, read_header
+from dataclasses import asdict, dataclass
+from typing import List, Optional
+
+# Blob prefix under which the render farm publishes frames and the manifest describing them
+FRAMES_PREFIX = 'frames'
+MANIFEST_NAME = 'manifest.json'
+
+@dataclass
+class FrameEntry:
+    file: str
+    width: int
+    height: int
+    sha256: str
+    # frame_digest of the planes with excluded_regions blanked, to compare against last_frame.txt
+    digest: str
+    excluded_regions: List[List[int]]
+
+@dataclass
+class FrameManifest:
+    generated: str
+    payload_generation: Optional[int]
+    profiles: dict[str, FrameEntry]
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), indent=2)
+
+    @classmethod
+    def from_json(cls, data: bytes) -> 'FrameManifest':
+        try:
+            manifest = json.loads(data)
+            return cls(manifest['generated'], manifest['payload_generation'],
+                { name: FrameEntry(**entry) for (name, entry) in manifest['profiles'].items() })
+        except (KeyError, TypeError, AttributeError, json.JSONDecodeError) as e:
+            raise ValueError(f"Malformed frame manifest: {e!r}") from e
+
+def file_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def check_frame(data: bytes, width: int, height: int) -> FrameHeader:
+    header = read_header(data)
+    if (header.width, header.height, len(header.plane_lengths)) != (width, height, 2):
+        raise ValueError(f"Frame has {len(header.plane_lengths)} {header.width}x{header.height} planes but the display needs 2 {width}x{height} planes")
+    return header
+
+def unpack_frame(data: bytes, width: int, height: int) -> tuple[bytes, bytes]:
+    check_frame(data, width, height)
+    (_, planes) = decode_frame(data)
+    return (planes[0], planes[1])
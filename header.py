@@ -1,49 +1,45 @@
 import logging;
-import os;
-from configparser import SafeConfigParser
 from datetime import datetime
+from fonts import FontConfig, font_registry
+from icon_atlas import icon_atlas
 from layout import Layout
+from organizer_config import OrganizerConfig
 from PIL import ImageDraw, ImageFont
 from power import PowerHelper
+from text_metrics import text_metrics
 
 logger = logging.getLogger(__name__)
 
-class HeaderConfig(object):
+class HeaderConfig(FontConfig):
+    fonts = ('font', 'icon_font', 'body_font')
 
-    def __init__(self):
-        self.parser = SafeConfigParser()
-        self.parser.sections()
-        found = self.parser.read('config/organizer.cfg')
-        if not found:
-            raise ValueError('No config file found!')
-        self.fontdir = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'font')
-    
     @property
     def font(self) -> ImageFont:
-        font = self.parser.get('header', 'font')
-        font_size = int(self.parser.get('header', 'font_size'))
-        return ImageFont.truetype(os.path.join(self.fontdir, f'{font}.ttf'), font_size)
+        return font_registry.get(self.config.font_path(self.config.header.font), self.config.header.font_size)
 
     @property
     def icon_font(self) -> ImageFont:
-      return ImageFont.truetype(os.path.join(self.fontdir, 'fa5-solid.otf'), 25)
+      return font_registry.get(self.config.font_path('fa5-solid', 'otf'), 25)
 
     @property
     def body_font(self) -> ImageFont:
-        font = self.parser.get('body', 'font')
-        font_size = int(self.parser.get('body', 'font_size'))
-        return ImageFont.truetype(os.path.join(self.fontdir, f'{font}.ttf'), font_size)
+        return font_registry.get(self.config.font_path(self.config.body.font), self.config.body.font_size)
+
+    @property
+    def refresh_on_clock_change(self) -> bool:
+        return self.config.header.refresh_on_clock_change
 
 class Header(object):
 
-    def __init__(self, layout: Layout, power_helper: PowerHelper):
-        self.config = HeaderConfig()
+    def __init__(self, layout: Layout, power_helper: PowerHelper, config: OrganizerConfig):
+        self.config = HeaderConfig(config)
         self.layout = layout
         self.power_helper = power_helper
+        self.clock_region = None
 
     def draw_header_text(self, image: ImageDraw) -> None:
         todays_date = datetime.today().strftime('%A, %B %d')
-        (header_w, header_h) = image.textsize(todays_date, font=self.config.font)
+        (header_w, header_h) = text_metrics.size(todays_date, self.config.font)
         image.text(
             (((self.layout.width - header_w) / 2), 5),
             todays_date,
@@ -52,10 +48,18 @@ class Header(object):
 
     def draw_last_updated(self, image: ImageDraw) -> None:
         current_time = datetime.now().strftime("%H:%M")
-        (time_w, time_h) = image.textsize(current_time, font=self.config.body_font)
-        (battery_w, battery_h) = image.textsize('\uf243', font=self.config.icon_font)
+        (time_w, time_h) = text_metrics.size(current_time, self.config.body_font)
+        (battery_w, battery_h) = text_metrics.size('\uf243', self.config.icon_font)
     
-        image.text(((self.layout.width - self.layout.border - time_w - battery_w - 10), 17), current_time, font = self.config.body_font, fill = "#ffffff")
+        time_x = self.layout.width - self.layout.border - time_w - battery_w - 10
+        image.text((time_x, 17), current_time, font = self.config.body_font, fill = "#ffffff")
+        self.clock_region = (time_x, 17, time_x + time_w, 17 + time_h)
+
+    @property
+    def excluded_regions(self) -> list[tuple[int, int, int, int]]:
+        if self.config.refresh_on_clock_change or self.clock_region is None:
+            return []
+        return [self.clock_region]
 
     def draw_battery_state(self, black_image: ImageDraw, red_image: ImageDraw) -> None:
         battery_icon = '\uf244'
@@ -76,8 +80,8 @@ class Header(object):
             battery_icon = '\uf244'
             battery_image = red_image
             battery_color = '#000000'
-        (battery_w, battery_h) = black_image.textsize('\uf243', font=self.config.icon_font)
-        battery_image.text(((self.layout.width - self.layout.border - battery_w), 15), battery_icon, font=self.config.icon_font, fill = battery_color)
+        (battery_w, battery_h) = text_metrics.size('\uf243', self.config.icon_font)
+        icon_atlas.draw(battery_image, ((self.layout.width - self.layout.border - battery_w), 15), battery_icon, self.config.icon_font, fill = battery_color)
 
     def render(self, black_image: ImageDraw, red_image: ImageDraw) -> None:
         logger.info("Rendering")
@@ -0,0 +1,132 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import PIL
+from atomic_file import write_atomic
+from PIL import Image, ImageDraw, ImageFont
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Glyphs are packed onto shelves of a sheet this wide
+SHEET_WIDTH = 256
+
+def code_version() -> str:
+    # Changes to how glyphs are rasterized or placed must not reuse a sheet built by the old code
+    with open(os.path.realpath(__file__), 'rb') as source_file:
+        return hashlib.sha256(source_file.read()).hexdigest()
+
+class Glyph(object):
+
+    def __init__(self, bitmap: Image, left: int, top: int):
+        self.bitmap = bitmap
+        self.left = left
+        self.top = top
+
+class IconAtlas(object):
+
+    def __init__(self, path: str = 'cache/icons'):
+        self.path = path
+        self._glyphs = None
+        self._fonts = {}
+        self.dirty = False
+        self.rasterized = 0
+        # Glyphs rasterized since the sheet was last saved, so worker processes can hand them back
+        self.added = {}
+
+    def _font_version(self, font: ImageFont) -> int:
+        path = font.path
+        if path not in self._fonts:
+            self._fonts[path] = os.stat(path).st_mtime_ns
+        return self._fonts[path]
+
+    def _key(self, text: str, font: ImageFont) -> str:
+        codepoints = '-'.join(f'{ord(char):x}' for char in text)
+        return f'{os.path.basename(font.path)}:{self._font_version(font)}:{font.size}:{codepoints}'
+
+    def load(self) -> None:
+        self._glyphs = {}
+        try:
+            with open(f'{self.path}.json', 'r') as index_file:
+                index = json.load(index_file)
+            sheet = Image.open(f'{self.path}.png')
+            sheet.load()
+        except (IOError, ValueError):
+            logger.info("Icon atlas did not exist, glyphs will be rasterized")
+            return
+        # Rasterization can change between Pillow releases, so start over after an upgrade
+        if index.get('pillow') != PIL.__version__ or index.get('code') != code_version():
+            logger.info("Icon atlas was built by another Pillow version or atlas code, ignoring it")
+            self.dirty = True
+            return
+        for (key, (x, y, w, h, left, top)) in index['glyphs'].items():
+            self._glyphs[key] = Glyph(sheet.crop((x, y, x + w, y + h)), left, top)
+
+    def glyph(self, text: str, font: ImageFont) -> Glyph:
+        if self._glyphs is None:
+            self.load()
+        key = self._key(text, font)
+        glyph = self._glyphs.get(key)
+        if glyph is None:
+            glyph = self.rasterize(text, font)
+            self._glyphs[key] = glyph
+            self.added[key] = glyph
+            self.dirty = True
+        return glyph
+
+    def merge(self, glyphs: dict[str, Glyph]) -> None:
+        if self._glyphs is None:
+            self.load()
+        for (key, glyph) in glyphs.items():
+            if key not in self._glyphs:
+                self._glyphs[key] = glyph
+                self.dirty = True
+
+    def rasterize(self, text: str, font: ImageFont) -> Glyph:
+        scratch = ImageDraw.Draw(Image.new('1', (1, 1)))
+        (left, top, right, bottom) = scratch.textbbox((0, 0), text, font=font)
+        bitmap = Image.new('1', (max(right - left, 1), max(bottom - top, 1)), 0)
+        ImageDraw.Draw(bitmap).text((-left, -top), text, font=font, fill=255)
+        self.rasterized += 1
+        return Glyph(bitmap, left, top)
+
+    # Blit an icon exactly where ImageDraw.text would have drawn it
+    def draw(self, image: ImageDraw, xy: tuple[int, int], text: str, font: ImageFont, fill: Optional[str] = None) -> None:
+        glyph = self.glyph(text, font)
+        (x, y) = xy
+        image.bitmap((x + glyph.left, y + glyph.top), glyph.bitmap, fill=fill)
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        # Shelf packing: glyphs go left to right, tallest first, wrapping onto a new shelf when full
+        current = { os.path.basename(path): version for (path, version) in self._fonts.items() }
+        placed = {}
+        (x, y, shelf_h) = (0, 0, 0)
+        for (key, glyph) in sorted(self._glyphs.items(), key=lambda item: -item[1].bitmap.height):
+            (font, version, _) = key.split(':', 2)
+            if font in current and int(version) != current[font]:
+                continue # Rasterized from an older copy of a font file that has since changed
+            (w, h) = glyph.bitmap.size
+            if x + w > SHEET_WIDTH:
+                (x, y, shelf_h) = (0, y + shelf_h, 0)
+            placed[key] = (x, y, w, h, glyph.left, glyph.top)
+            x += w
+            shelf_h = max(shelf_h, h)
+        sheet = Image.new('1', (SHEET_WIDTH, max(y + shelf_h, 1)), 0)
+        for (key, (x, y, _, _, _, _)) in placed.items():
+            sheet.paste(self._glyphs[key].bitmap, (x, y))
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        png = io.BytesIO()
+        sheet.save(png, format='PNG')
+        write_atomic(f'{self.path}.png', png.getvalue())
+        write_atomic(f'{self.path}.json', json.dumps({ 'pillow': PIL.__version__, 'code': code_version(), 'glyphs': placed }))
+        self.dirty = False
+        self.added.clear()
+        logger.info(f"Saved icon atlas with {len(placed)} glyphs to {self.path}.png")
+
+# Glyphs saved by one wake are loaded by the next, so an icon is rasterized only when it or its font changes
+icon_atlas = IconAtlas()
@@ -0,0 +1,67 @@
+import argparse
+import os
+import subprocess
+import sys
+
+# Measured on the machine running the check. A Pi Zero W imports roughly ten times slower,
+# and the estimate for it is printed alongside.
+DEFAULT_BUDGET_MS = 1000
+PI_ZERO_FACTOR = 10
+
+# What every wake imports, skip or not: the entry point, then the modules the payload fetch loads
+SKIP_PATH = ['main', 'google.cloud.storage', 'google.api_core.exceptions', 'google.auth.exceptions']
+
+# Only needed once there is something to draw, so the skip path must not pull them in
+RENDER_ONLY = ['PIL', 'dataclasses_json', 'dateutil', 'waveshare_epd', 'dashboard', 'summary']
+
+def import_times(modules: list[str]) -> tuple[float, list[tuple[str, int, int]]]:
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {", ".join(modules)}'],
+        cwd=os.path.dirname(os.path.realpath(__file__)), capture_output=True, text=True)
+    if result.returncode != 0:
+        errors = [line for line in result.stderr.splitlines() if not line.startswith('import time:')]
+        raise RuntimeError(f"Importing {', '.join(modules)} failed:\n" + '\n'.join(errors))
+    times = []
+    total_us = 0
+    started = False
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        (self_us, cumulative_us, name) = line[len('import time:'):].split('|')
+        top_level = not name[1:].startswith(' ')
+        name = name.strip()
+        # Top-level entries before the first requested module were imported by interpreter start-up
+        if top_level and (name in modules or any(module.startswith(name + '.') for module in modules)):
+            started = True
+        if top_level and started:
+            total_us += int(cumulative_us)
+        # Nesting is shown by indentation, which is not needed once everything is sorted
+        times.append((name, int(self_us), int(cumulative_us)))
+    return (total_us / 1000, times)
+
+def check(modules: list[str], budget_ms: float, top: int) -> list[str]:
+    (total_ms, times) = import_times(modules)
+    print(f"{'module':<48}{'self':>10}{'cumulative':>12}")
+    for (name, self_us, cumulative_us) in sorted(times, key=lambda item: -item[2])[:top]:
+        print(f"{name:<48}{self_us / 1000:>8.1f}ms{cumulative_us / 1000:>10.1f}ms")
+
+    problems = []
+    print(f"Importing {', '.join(modules)} took {total_ms:.1f}ms of a {budget_ms:.0f}ms budget (about {total_ms * PI_ZERO_FACTOR / 1000:.1f}s on a Pi Zero W)")
+    if total_ms > budget_ms:
+        problems.append(f"{', '.join(modules)} took {total_ms:.1f}ms to import, over the {budget_ms:.0f}ms budget")
+    names = { name for (name, _, _) in times }
+    for heavy in RENDER_ONLY:
+        if heavy not in modules and any(name == heavy or name.startswith(heavy + '.') for name in names):
+            problems.append(f"{', '.join(modules)} imports render-only module {heavy}")
+    return problems
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description='Report what a wake imports before it knows whether to render, and check it against a budget')
+    argument_parser.add_argument('--module', action='append', help='Module to import, may be repeated (default: main and the payload fetch imports)')
+    argument_parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS, help='Cumulative import time allowed')
+    argument_parser.add_argument('--top', type=int, default=20, help='Number of slowest imports to list')
+    args = argument_parser.parse_args()
+
+    problems = check(args.module or SKIP_PATH, args.budget_ms, args.top)
+    for problem in problems:
+        print(f'OVER BUDGET {problem}')
+    sys.exit(1 if problems else 0)
@@ -1,45 +1,24 @@
 import logging
-from configparser import SafeConfigParser
-from dataclasses import dataclass
+from organizer_config import OrganizerConfig
 from PIL import ImageDraw
 
 logger = logging.getLogger(__name__)
 
 class LayoutConfig(object):
 
-    def __init__(self):
-        self.parser = SafeConfigParser()
-        self.parser.sections()
-        found = self.parser.read('config/organizer.cfg')
-        if not found:
-            raise ValueError('No config file found!')
-    
-    @property
-    def column_height(self) -> int:
-        return int(self.parser.get('layout', 'column.height'))    
-    
-    @property
-    def column_width(self) -> int:
-        return int(self.parser.get('layout', 'column.width'))
-
-    @property
-    def divider_width(self) -> int:
-        return int(self.parser.get('layout', 'divider.width'))
-
-    @property
-    def header_height(self) -> int:
-        return int(self.parser.get('header', 'height'))
-
-    @property
-    def side_border_width(self) -> int:
-        return int(self.parser.get('layout', 'side_border.width'))
+    def __init__(self, config: OrganizerConfig):
+        self.column_height = config.layout.column_height
+        self.column_width = config.layout.column_width
+        self.divider_width = config.layout.divider_width
+        self.header_height = config.header.height
+        self.side_border_width = config.layout.side_border_width
     
 class Layout(object):
 
-    def __init__(self, screen_width, screen_height):
+    def __init__(self, screen_width, screen_height, config: OrganizerConfig):
         self.screen_width = screen_width
         self.screen_height = screen_height
-        self.config = LayoutConfig()
+        self.config = LayoutConfig(config)
 
     @property
     def width(self) -> int:
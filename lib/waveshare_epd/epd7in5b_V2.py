@@ -29,12 +29,29 @@
 
 
 import logging
+import time
 from . import epdconfig
 
 # Display resolution
 EPD_WIDTH       = 800
 EPD_HEIGHT      = 480
 
+# spidev rejects transfers larger than its buffer (4096 bytes by default)
+SPI_CHUNK_SIZE  = 4096
+
+# BUSY waits longer than this raise instead of hanging; a tri-colour refresh takes 15-20s
+BUSY_TIMEOUT_MS = 60000
+
+# Longest single wait on a BUSY edge before the pin is checked again
+BUSY_EDGE_SLICE_MS = 1000
+
+# Lookup table used to invert a whole plane with bytes.translate
+INVERT_TABLE    = bytes(0xFF - i for i in range(256))
+
+# Lookup table from a palette image (index 0 black, 1 white, 2 red) to the
+# mode '1' red plane, with 0 marking the red pixels
+RED_PLANE       = [255, 255, 0] + [255] * 253
+
 logger = logging.getLogger(__name__)
 
 class EPD:
@@ -45,6 +62,9 @@ class EPD:
         self.cs_pin = epdconfig.CS_PIN
         self.width = EPD_WIDTH
         self.height = EPD_HEIGHT
+        self.busy_seconds = 0.0
+        self.last_busy_ms = 0.0
+        self.busy_timeout_ms = BUSY_TIMEOUT_MS
 
     # Hardware reset
     def reset(self):
@@ -66,16 +86,52 @@ class EPD:
         epdconfig.digital_write(self.cs_pin, 0)
         epdconfig.spi_writebyte([data])
         epdconfig.digital_write(self.cs_pin, 1)
+
+    # Stream a whole buffer with DC/CS set once instead of once per byte
+    def send_data2(self, data):
+        self.send_chunks([data])
+
+    # Stream a buffer that arrives in pieces, such as a plane being decompressed
+    def send_chunks(self, chunks, invert=False):
+        epdconfig.digital_write(self.dc_pin, 1)
+        epdconfig.digital_write(self.cs_pin, 0)
+        for chunk in chunks:
+            if invert:
+                chunk = chunk.translate(INVERT_TABLE)
+            for offset in range(0, len(chunk), SPI_CHUNK_SIZE):
+                epdconfig.spi_writebyte2(chunk[offset:offset + SPI_CHUNK_SIZE])
+        epdconfig.digital_write(self.cs_pin, 1)
         
-    def ReadBusy(self):
+    def ReadBusy(self, timeout_ms=None):
         logger.debug("e-Paper busy")
+        timeout_ms = timeout_ms or self.busy_timeout_ms
+        start = time.perf_counter()
+        deadline = start + timeout_ms / 1000.0
         self.send_command(0x71)
-        busy = epdconfig.digital_read(self.busy_pin)
-        while(busy == 0):
-            self.send_command(0x71)
-            busy = epdconfig.digital_read(self.busy_pin)
-        epdconfig.delay_ms(200)
-        logger.debug("e-Paper busy release")
+        if epdconfig.digital_read(self.busy_pin) == 0:
+            wait_for_edge = getattr(epdconfig, 'wait_for_edge', None)
+            poll_ms = 1
+            while True:
+                remaining_ms = (deadline - time.perf_counter()) * 1000
+                if remaining_ms <= 0:
+                    # Hold the controller in reset and release the bus rather than leave a stuck
+                    # panel powered; the next init() starts it up again
+                    epdconfig.module_exit()
+                    raise TimeoutError(f"e-Paper still busy after {timeout_ms}ms")
+                if wait_for_edge is not None:
+                    # Wait in slices so an edge that fired before the wait began is still noticed
+                    wait_for_edge(self.busy_pin, min(remaining_ms, BUSY_EDGE_SLICE_MS))
+                else:
+                    epdconfig.delay_ms(min(remaining_ms, poll_ms))
+                    poll_ms = min(poll_ms * 2, 100)
+                self.send_command(0x71)
+                if epdconfig.digital_read(self.busy_pin) != 0:
+                    break
+        self.last_busy_ms = (time.perf_counter() - start) * 1000
+        self.busy_seconds += self.last_busy_ms / 1000
+        logger.debug(f"e-Paper busy release after {self.last_busy_ms:.0f}ms")
+        if self.last_busy_ms > 1:
+            epdconfig.delay_ms(200)
         
     def init(self):
         if (epdconfig.module_init() != 0):
@@ -127,50 +183,105 @@ class EPD:
         return 0
 
     def getbuffer(self, image):
-        # logger.debug("bufsiz = ",int(self.width/8) * self.height)
-        buf = [0xFF] * (int(self.width/8) * self.height)
+        # Mode '1' images pack to one bit per pixel, MSB first, with 0 for
+        # black, which is exactly the layout the controller expects. Packing the
+        # whole frame with tobytes() replaces the per-pixel loop.
         image_monocolor = image.convert('1')
         imwidth, imheight = image_monocolor.size
-        pixels = image_monocolor.load()
         logger.debug('imwidth = %d  imheight =  %d ',imwidth, imheight)
         if(imwidth == self.width and imheight == self.height):
             logger.debug("Horizontal")
-            for y in range(imheight):
-                for x in range(imwidth):
-                    # Set the bits for the column of pixels at the current position.
-                    if pixels[x, y] == 0:
-                        buf[int((x + y * self.width) / 8)] &= ~(0x80 >> (x % 8))
         elif(imwidth == self.height and imheight == self.width):
             logger.debug("Vertical")
-            for y in range(imheight):
-                for x in range(imwidth):
-                    newx = y
-                    newy = self.height - x - 1
-                    if pixels[x, y] == 0:
-                        buf[int((newx + newy*self.width) / 8)] &= ~(0x80 >> (y % 8))
-        return buf
+            # Imported here so a thin client sending pre-packed frames never loads Pillow
+            from PIL import Image
+            image_monocolor = image_monocolor.transpose(Image.ROTATE_90)
+        else:
+            return bytearray([0xFF] * (int(self.width/8) * self.height))
+        return bytearray(image_monocolor.tobytes('raw', '1'))
+
+    def getbuffers(self, image, red=True):
+        # Split a palette image into the black and red planes. Every pixel has
+        # a single index, so it can never end up in both planes. The P;1 packer
+        # sets a bit for every non-zero index, which packs the black plane
+        # directly; the red plane needs one lookup first, and is skipped when
+        # the caller knows nothing red was drawn.
+        blank = bytearray(b'\xff' * (int(self.width/8) * self.height))
+        imwidth, imheight = image.size
+        if(imwidth == self.height and imheight == self.width):
+            from PIL import Image
+            image = image.transpose(Image.ROTATE_90)
+        elif(imwidth != self.width or imheight != self.height):
+            return (blank, bytearray(blank))
+        black = bytearray(image.tobytes('raw', 'P;1'))
+        if not red:
+            return (black, blank)
+        return (black, bytearray(image.point(RED_PLANE, '1').tobytes('raw', '1')))
 
     def display(self, imageblack, imagered):
+        self.display_chunks([bytes(imageblack)], [bytes(imagered)])
+
+    # Full refresh from planes given as chunks, so a packed frame can be sent as it is decoded
+    def display_chunks(self, black_chunks, red_chunks):
         self.send_command(0x10)
-        for i in range(0, int(self.width * self.height / 8)):
-            self.send_data(imageblack[i]);
+        self.send_chunks(black_chunks)
         
         self.send_command(0x13)
-        for i in range(0, int(self.width * self.height / 8)):
-            self.send_data(~imagered[i]);
+        self.send_chunks(red_chunks, invert=True)
         
         self.send_command(0x12)
         epdconfig.delay_ms(100)
         self.ReadBusy()
         
+    # Align a window to whole bytes horizontally and clamp it to the panel
+    def align_window(self, x_start, y_start, x_end, y_end):
+        x_start = max(0, int(x_start) // 8 * 8)
+        x_end = min(self.width, (int(x_end) + 7) // 8 * 8)
+        y_start = max(0, int(y_start))
+        y_end = min(self.height, int(y_end))
+        return (x_start, y_start, x_end, y_end)
+
+    def window_buffer(self, buf, x_start, y_start, x_end, y_end):
+        row_bytes = int(self.width / 8)
+        view = memoryview(bytes(buf))
+        return b''.join(view[y * row_bytes + x_start // 8:y * row_bytes + x_end // 8] for y in range(y_start, y_end))
+
+    # Refresh only the given window; buffers are full frames from getbuffer
+    def display_partial(self, imageblack, imagered, x_start, y_start, x_end, y_end):
+        (x_start, y_start, x_end, y_end) = self.align_window(x_start, y_start, x_end, y_end)
+        if x_end <= x_start or y_end <= y_start:
+            return
+
+        self.send_command(0x91) # PARTIAL_IN
+        self.send_command(0x90) # PARTIAL_WINDOW
+        self.send_data(x_start >> 8)
+        self.send_data(x_start & 0xFF)
+        self.send_data((x_end - 1) >> 8)
+        self.send_data((x_end - 1) & 0xFF)
+        self.send_data(y_start >> 8)
+        self.send_data(y_start & 0xFF)
+        self.send_data((y_end - 1) >> 8)
+        self.send_data((y_end - 1) & 0xFF)
+        self.send_data(0x01)    # Scan inside and outside the window
+
+        self.send_command(0x10)
+        self.send_data2(self.window_buffer(imageblack, x_start, y_start, x_end, y_end))
+
+        self.send_command(0x13)
+        self.send_data2(self.window_buffer(imagered, x_start, y_start, x_end, y_end).translate(INVERT_TABLE))
+
+        self.send_command(0x12)
+        epdconfig.delay_ms(100)
+        self.ReadBusy()
+        self.send_command(0x92) # PARTIAL_OUT
+
     def Clear(self):
+        buffer_size = int(self.width * self.height / 8)
         self.send_command(0x10)
-        for i in range(0, int(self.width * self.height / 8)):
-            self.send_data(0xff)
+        self.send_data2(b'\xff' * buffer_size)
             
         self.send_command(0x13)
-        for i in range(0, int(self.width * self.height / 8)):
-            self.send_data(0x00)
+        self.send_data2(b'\x00' * buffer_size)
                 
         self.send_command(0x12)
         epdconfig.delay_ms(100)
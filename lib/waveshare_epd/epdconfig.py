@@ -58,6 +58,10 @@ class RaspberryPi:
     def delay_ms(self, delaytime):
         time.sleep(delaytime / 1000.0)
 
+    # Block until the pin rises or the timeout passes; returns None on timeout
+    def wait_for_edge(self, pin, timeout_ms):
+        return self.GPIO.wait_for_edge(pin, self.GPIO.RISING, timeout=max(1, int(timeout_ms)))
+
     def spi_writebyte(self, data):
         self.SPI.writebytes(data)
 
@@ -124,9 +128,16 @@ class JetsonNano:
     def delay_ms(self, delaytime):
         time.sleep(delaytime / 1000.0)
 
+    def wait_for_edge(self, pin, timeout_ms):
+        return self.GPIO.wait_for_edge(pin, self.GPIO.RISING, timeout=max(1, int(timeout_ms)))
+
     def spi_writebyte(self, data):
         self.SPI.SYSFS_software_spi_transfer(data[0])
 
+    def spi_writebyte2(self, data):
+        for value in data:
+            self.SPI.SYSFS_software_spi_transfer(value)
+
     def module_init(self):
         self.GPIO.setmode(self.GPIO.BCM)
         self.GPIO.setwarnings(False)
@@ -148,13 +159,149 @@ class JetsonNano:
         self.GPIO.cleanup([self.RST_PIN, self.DC_PIN, self.CS_PIN, self.BUSY_PIN])
 
 
-if os.path.exists('/sys/bus/platform/drivers/gpiomem-bcm2835'):
+class Simulator:
+    # Pin definition
+    RST_PIN         = 17
+    DC_PIN          = 25
+    CS_PIN          = 8
+    BUSY_PIN        = 24
+
+    # How long the panel holds BUSY low after each command, in milliseconds
+    BUSY_MS = {
+        0x02: 100,      # POWER_OFF
+        0x04: 100,      # POWER_ON
+        0x12: 15000,    # DISPLAY_REFRESH
+    }
+
+    def __init__(self):
+        # Scales modelled delays and BUSY time; 0 runs instantly, 1 matches the real panel
+        self.time_scale = float(os.environ.get('EPD_SIMULATOR_TIME_SCALE', '0'))
+        self.output_path = os.environ.get('EPD_SIMULATOR_OUTPUT', 'simulator.png')
+        self.reset()
+
+    def reset(self):
+        self.pins = {}
+        self.stream = []
+        self.spi_calls = 0
+        self.spi_bytes = 0
+        self.busy_until = 0.0
+        self.busy_ms = 0.0
+        self.frames = 0
+        self.ram = {}
+        self.window = None
+
+    def last_data(self, command):
+        for (cmd, data) in reversed(self.stream):
+            if cmd == command:
+                return bytes(data)
+        return None
+
+    def digital_write(self, pin, value):
+        self.pins[pin] = value
+
+    def digital_read(self, pin):
+        if pin == self.BUSY_PIN:
+            return 0 if time.monotonic() < self.busy_until else 1
+        return self.pins.get(pin, 0)
+
+    def delay_ms(self, delaytime):
+        if self.time_scale > 0:
+            time.sleep(delaytime * self.time_scale / 1000.0)
+
+    def wait_for_edge(self, pin, timeout_ms):
+        remaining = self.busy_until - time.monotonic()
+        if remaining > 0:
+            time.sleep(min(remaining, timeout_ms / 1000.0))
+        return pin if self.digital_read(pin) == 1 else None
+
+    def spi_writebyte(self, data):
+        self.spi_calls += 1
+        self.spi_bytes += len(data)
+        if self.pins.get(self.DC_PIN, 0) == 0:
+            for command in data:
+                self.stream.append((command, bytearray()))
+                self.on_command(command)
+        elif self.stream:
+            self.stream[-1][1].extend(data)
+
+    def spi_writebyte2(self, data):
+        self.spi_writebyte(data)
+
+    # Copy the data of the previous command into panel RAM, honouring any partial window
+    def apply_previous(self):
+        if len(self.stream) < 2:
+            return
+        (command, data) = self.stream[-2]
+        if command == 0x90 and len(data) >= 8:
+            self.window = ((data[0] << 8) | data[1], (data[4] << 8) | data[5], ((data[2] << 8) | data[3]) + 1, ((data[6] << 8) | data[7]) + 1)
+        elif command == 0x92:
+            self.window = None
+        elif command in (0x10, 0x13):
+            (width, height) = self.resolution()
+            row_bytes = int(width / 8)
+            ram = self.ram.setdefault(command, bytearray((b'\xff' if command == 0x10 else b'\x00') * (row_bytes * height)))
+            (x_start, y_start, x_end, y_end) = self.window or (0, 0, width, height)
+            window_bytes = int((x_end - x_start) / 8)
+            for row in range(y_end - y_start):
+                offset = (y_start + row) * row_bytes + int(x_start / 8)
+                ram[offset:offset + window_bytes] = data[row * window_bytes:(row + 1) * window_bytes]
+
+    def on_command(self, command):
+        self.apply_previous()
+        if command == 0x12:
+            self.write_frame()
+        busy_ms = self.BUSY_MS.get(command)
+        if busy_ms is not None:
+            self.busy_ms += busy_ms
+            self.busy_until = time.monotonic() + busy_ms * self.time_scale / 1000.0
+
+    def resolution(self):
+        data = self.last_data(0x61)
+        if data is None or len(data) < 4:
+            return (800, 480)
+        return ((data[0] << 8) | data[1], (data[2] << 8) | data[3])
+
+    def decode_frame(self):
+        from PIL import Image, ImageChops
+
+        (width, height) = self.resolution()
+        size = int(width / 8) * height
+        black = bytes(self.ram.get(0x10, b'')).ljust(size, b'\xff')[:size]
+        red = bytes(self.ram.get(0x13, b'')).ljust(size, b'\x00')[:size]
+        # Black ink is sent as 0 bits and red ink as 1 bits
+        black_mask = ImageChops.invert(Image.frombytes('1', (width, height), black))
+        red_mask = Image.frombytes('1', (width, height), red)
+        frame = Image.new('RGB', (width, height), (255, 255, 255))
+        frame.paste((0, 0, 0), mask=black_mask)
+        frame.paste((255, 0, 0), mask=red_mask)
+        return frame
+
+    def write_frame(self):
+        self.frames += 1
+        if self.output_path:
+            self.decode_frame().save(self.output_path)
+            logger.debug("Simulated frame written to %s", self.output_path)
+
+    def module_init(self):
+        return 0
+
+    def module_exit(self):
+        logger.debug("simulator end")
+
+
+if os.environ.get('EPD_BACKEND') == 'simulator':
+    implementation = Simulator()
+elif os.path.exists('/sys/bus/platform/drivers/gpiomem-bcm2835'):
     implementation = RaspberryPi()
 else:
     implementation = JetsonNano()
 
+# Export the functions and pin numbers only; backend state such as the simulator's
+# counters changes after import, so read it through epdconfig.implementation
 for func in [x for x in dir(implementation) if not x.startswith('_')]:
-    setattr(sys.modules[__name__], func, getattr(implementation, func))
+    value = getattr(implementation, func)
+    if callable(value) or func.endswith('_PIN'):
+        setattr(sys.modules[__name__], func, value)
 
 
 ### END OF FILE ###
@@ -0,0 +1,98 @@
+import logging
+import os
+from configparser import ConfigParser
+from dataclasses import dataclass
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.realpath(__file__))
+DEFAULT_CONFIG_PATH = os.path.join(BASE_DIR, 'config', 'organizer.cfg')
+CONFIG_PATH_ENV = 'ORGANIZER_CONFIG'
+
+@dataclass(frozen=True)
+class LayoutSettings:
+    side_border_width: int
+    column_height: int
+    column_width: int
+    divider_width: int
+
+@dataclass(frozen=True)
+class HeaderSettings:
+    font: str
+    font_size: int
+    height: int
+    refresh_on_clock_change: bool
+    partial_refresh: bool
+
+@dataclass(frozen=True)
+class DisplaySettings:
+    max_partial_area: float
+    palette_canvas: bool
+    render_workers: int
+
+@dataclass(frozen=True)
+class FontSettings:
+    font: str
+    font_size: int
+
+@dataclass(frozen=True)
+class OrganizerConfig:
+    path: str
+    fontdir: str
+    layout: LayoutSettings
+    header: HeaderSettings
+    body: FontSettings
+    schedule: FontSettings
+    action_list: FontSettings
+    footer: FontSettings
+    display: DisplaySettings
+
+    def font_path(self, font: str, extension: str = 'ttf') -> str:
+        return os.path.join(self.fontdir, f'{font}.{extension}')
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> 'OrganizerConfig':
+        path = path or os.environ.get(CONFIG_PATH_ENV) or DEFAULT_CONFIG_PATH
+        parser = ConfigParser()
+        if not parser.read(path):
+            raise ValueError(f'No config file found at {path}!')
+        logger.info(f"Loaded config from {path}")
+
+        def get(section: str, option: str) -> str:
+            if not parser.has_option(section, option):
+                raise ValueError(f'Missing [{section}] {option} in {path}')
+            return parser.get(section, option)
+
+        def get_int(section: str, option: str) -> int:
+            value = get(section, option)
+            try:
+                return int(value)
+            except ValueError:
+                raise ValueError(f'[{section}] {option} in {path} must be an integer, got {value!r}')
+
+        def get_header_font(section: str) -> FontSettings:
+            return FontSettings(get(section, 'header_font'), get_int(section, 'header_font_size'))
+
+        return cls(
+            path = path,
+            fontdir = os.path.join(BASE_DIR, 'font'),
+            layout = LayoutSettings(
+                side_border_width = get_int('layout', 'side_border.width'),
+                column_height = get_int('layout', 'column.height'),
+                column_width = get_int('layout', 'column.width'),
+                divider_width = get_int('layout', 'divider.width')),
+            header = HeaderSettings(
+                font = get('header', 'font'),
+                font_size = get_int('header', 'font_size'),
+                height = get_int('header', 'height'),
+                refresh_on_clock_change = parser.getboolean('header', 'refresh_on_clock_change', fallback=False),
+                partial_refresh = parser.getboolean('header', 'partial_refresh', fallback=False)),
+            body = FontSettings(get('body', 'font'), get_int('body', 'font_size')),
+            schedule = get_header_font('schedule'),
+            action_list = get_header_font('action-list'),
+            footer = get_header_font('footer'),
+            display = DisplaySettings(
+                max_partial_area = parser.getfloat('display', 'partial_refresh.max_area', fallback=0.0),
+                palette_canvas = parser.getboolean('display', 'palette_canvas', fallback=False),
+                render_workers = parser.getint('display', 'render_workers', fallback=0)))
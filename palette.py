@@ -0,0 +1,39 @@
+from PIL import Image, ImageDraw, ImageFont
+from typing import Optional
+
+# Palette indices of the single-canvas render. Black is index 0 so drawing with the
+# default ink is black, as it is on the mode '1' planes. getbuffers in the display
+# driver relies on this layout.
+BLACK = 0
+WHITE = 1
+RED = 2
+PALETTE = [
+    0, 0, 0,
+    255, 255, 255,
+    255, 0, 0,
+]
+
+def new_canvas(width: int, height: int) -> Image:
+    canvas = Image.new('P', (width, height), WHITE)
+    canvas.putpalette(PALETTE)
+    return canvas
+
+class RedDraw(object):
+
+    # Stands in for the ImageDraw of the old red plane, where anything drawn showed up red
+    def __init__(self, draw: ImageDraw):
+        self.draw = draw
+        # Most frames have no red at all, which lets the red plane skip its pass
+        self.drawn = False
+
+    def text(self, xy: tuple[int, int], text: str, fill: Optional[str] = None, font: ImageFont = None) -> None:
+        self.drawn = True
+        self.draw.text(xy, text, fill=RED, font=font)
+
+    def rectangle(self, xy: list, fill: Optional[str] = None) -> None:
+        self.drawn = True
+        self.draw.rectangle(xy, fill=RED)
+
+    def bitmap(self, xy: tuple[int, int], bitmap: Image, fill: Optional[str] = None) -> None:
+        self.drawn = True
+        self.draw.bitmap(xy, bitmap, fill=RED)
@@ -0,0 +1,102 @@
+import json
+import logging
+import os
+from atomic_file import write_atomic
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from timing import timer
+from typing import Optional, TYPE_CHECKING
+
+# google-cloud-storage pulls in grpc, protobuf and auth, so it is imported on first fetch
+if TYPE_CHECKING:
+    from google.cloud import storage
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class PayloadMetadata:
+    generation: int
+    md5_hash: Optional[str]
+    etag: Optional[str]
+    updated: str
+
+@dataclass
+class Payload:
+    data: bytes
+    metadata: PayloadMetadata
+
+    @property
+    def updated(self) -> datetime:
+        return datetime.fromisoformat(self.metadata.updated).astimezone()
+
+class PayloadFetcher(object):
+
+    def __init__(self, project: str, bucket_name: str, blob_name: str, cache_dir: str = 'cache', client: 'storage.Client' = None):
+        self.project = project
+        self.bucket_name = bucket_name
+        self.blob_name = blob_name
+        self.cache_dir = cache_dir
+        self._client = client
+
+    @property
+    def client(self) -> 'storage.Client':
+        # STORAGE_EMULATOR_HOST is honoured by the client, so this can be pointed at a local fake GCS
+        if self._client is None:
+            with timer.span('import.gcs'):
+                from google.cloud import storage
+            self._client = storage.Client(self.project)
+        return self._client
+
+    @property
+    def data_path(self) -> str:
+        return os.path.join(self.cache_dir, self.blob_name)
+
+    @property
+    def metadata_path(self) -> str:
+        return os.path.join(self.cache_dir, f'{self.blob_name}.meta')
+
+    def read_cache(self) -> Optional[Payload]:
+        try:
+            with open(self.metadata_path, 'r') as metadata_file:
+                metadata = PayloadMetadata(**json.load(metadata_file))
+            with open(self.data_path, 'rb') as data_file:
+                data = data_file.read()
+        except (IOError, ValueError, TypeError):
+            logger.info("No usable cached payload")
+            return None
+        return Payload(data, metadata)
+
+    def write_cache(self, payload: Payload) -> None:
+        os.makedirs(os.path.dirname(self.data_path), exist_ok=True)
+        write_atomic(self.data_path, payload.data)
+        write_atomic(self.metadata_path, json.dumps(asdict(payload.metadata)))
+
+    def fetch(self) -> Payload:
+        with timer.span('import.gcs'):
+            from google.api_core import exceptions
+            from google.auth.exceptions import TransportError
+        cached = self.read_cache()
+        # bucket()/blob() only build references, so this skips the get_bucket metadata round-trip
+        blob = self.client.bucket(self.bucket_name).blob(self.blob_name)
+        try:
+            with timer.span('gcs.download'):
+                if cached is None:
+                    data = blob.download_as_bytes()
+                else:
+                    data = blob.download_as_bytes(if_generation_not_match=cached.metadata.generation)
+        except exceptions.NotModified:
+            logger.info(f"Payload generation {cached.metadata.generation} is unchanged, using cached copy")
+            return cached
+        except (exceptions.GoogleAPICallError, exceptions.RetryError, TransportError, IOError) as e:
+            if cached is None:
+                raise
+            logger.error(f"Unable to fetch payload, using cached copy: {e}")
+            return cached
+
+        # Download responses never fill in blob.updated, so record when this generation was first seen
+        updated = datetime.now().astimezone()
+        metadata = PayloadMetadata(blob.generation, blob.md5_hash, blob.etag, updated.isoformat())
+        payload = Payload(data, metadata)
+        self.write_cache(payload)
+        logger.info(f"Downloaded payload generation {metadata.generation}")
+        return payload
@@ -1,34 +1,105 @@
 import logging
-import subprocess
+import socket
 
 from datetime import datetime
+from timing import timer
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
 class PowerHelper:
-    def get_battery(self) -> float:
+    def __init__(self, host: str = '127.0.0.1', port: int = 8423, timeout: float = 2.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._socket = None
+        self._reader = None
+        self._battery = None
+
+    def _connect(self) -> None:
+        self._socket = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._reader = self._socket.makefile('r', encoding='utf-8', newline='\n')
+
+    def close(self) -> None:
+        if self._socket is not None:
+            try:
+                self._reader.close()
+                self._socket.close()
+            except OSError:
+                pass
+        self._socket = None
+        self._reader = None
+
+    def _send(self, command: str) -> str:
+        if self._socket is None:
+            self._connect()
+        self._socket.sendall(f'{command}\n'.encode('utf-8'))
+        response = self._reader.readline()
+        if not response:
+            raise ConnectionError(f'Power manager closed the connection during "{command}"')
+        return response.rstrip()
+
+    def request(self, command: str) -> str:
+        # The daemon may have dropped an idle connection, so reconnect once before giving up
+        try:
+            return self._send(command)
+        except OSError:
+            self.close()
+        try:
+            return self._send(command)
+        except OSError:
+            self.close()
+            raise
+
+    def get(self, name: str) -> str:
+        with timer.span(f'power.{name}'):
+            result_str = self.request(f'get {name}')
+        (key, _, value) = result_str.partition(':')
+        if key.strip() != name or not value:
+            raise ValueError(f'Unexpected response to "get {name}": {result_str}')
+        return value.strip()
+
+    def get_battery(self, refresh: bool = False) -> float:
+        if self._battery is not None and not refresh:
+            return self._battery
         battery_float = -1
         try:
-            ps = subprocess.Popen(('echo', 'get battery'), stdout=subprocess.PIPE)
-            result = subprocess.check_output(('nc', '-q', '0', '127.0.0.1', '8423'), stdin=ps.stdout)
-            ps.wait()
-            result_str = result.decode('utf-8').rstrip()
-            battery_level = result_str.split()[-1]
-            battery_float = float(battery_level)
-        except (ValueError, subprocess.CalledProcessError) as e:
-            logger.error(f'Invalid battery output: {result_str}. Likely on dedicated power.')
+            battery_float = float(self.get('battery'))
+        except (ValueError, OSError) as e:
+            logger.error(f'Invalid battery output: {e}. Likely on dedicated power.')
+        # The fallback is cached too, so a missing power manager costs one timeout per run rather than one per call
+        self._battery = battery_float
         return battery_float
 
+    def get_battery_voltage(self) -> Optional[float]:
+        try:
+            return float(self.get('battery_v'))
+        except (ValueError, OSError) as e:
+            logger.error(f'Unable to read battery voltage: {e}')
+            return None
+
+    def is_charging(self) -> Optional[bool]:
+        try:
+            return self.get('battery_charging') == 'true'
+        except (ValueError, OSError) as e:
+            logger.error(f'Unable to read charging state: {e}')
+            return None
+
+    def get_rtc_time(self) -> Optional[datetime]:
+        try:
+            return datetime.fromisoformat(self.get('rtc_time'))
+        except (ValueError, OSError) as e:
+            logger.error(f'Unable to read RTC time: {e}')
+            return None
+
     def set_next_boot_datetime(self, boot_time) -> None:
         try:
             formatted_boot_time = boot_time.astimezone().isoformat()
-            ps = subprocess.Popen(('echo', f'rtc_alarm_set {formatted_boot_time} 127'), stdout=subprocess.PIPE)
-            result = subprocess.check_output(('nc', '-q', '0', '127.0.0.1', '8423'), stdin=ps.stdout)
-            ps.wait()
-            result_str = result.decode('utf-8').rstrip()
+            with timer.span('power.rtc_alarm_set'):
+                result_str = self.request(f'rtc_alarm_set {formatted_boot_time} 127')
             if(result_str == 'rtc_alarm_set: done'):
                 logger.info(f"Successfully set next boot time to {formatted_boot_time}")
             else:
                 logger.error(f'Error setting next boot time to {formatted_boot_time}: {result_str}')
-        except (ValueError, subprocess.CalledProcessError) as e:
-            logger.error(f'Error setting next boot time to {boot_time}')
+        except (ValueError, OSError) as e:
+            logger.error(f'Error setting next boot time to {boot_time}: {e}')
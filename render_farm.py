@@ -0,0 +1,119 @@
+import argparse
+import glob
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from datetime import datetime
+from typing import Optional
+
+os.environ.setdefault('EPD_BACKEND', 'simulator')
+os.environ.setdefault('EPD_SIMULATOR_OUTPUT', '')
+libdir = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'lib')
+if os.path.exists(libdir):
+    sys.path.append(libdir)
+
+from atomic_file import write_atomic
+from chrome_cache import chrome_cache
+from dashboard import Dashboard
+from frame_format import encode_frame
+from frame_hash import frame_digest
+from frame_manifest import file_digest, FrameEntry, FrameManifest, FRAMES_PREFIX, MANIFEST_NAME
+from icon_atlas import icon_atlas
+from updater import create_fetcher
+from organizer_config import BASE_DIR, OrganizerConfig
+from power import PowerHelper
+from summary import Summary
+from waveshare_epd import epd7in5b_V2
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILES = os.path.join(BASE_DIR, 'config', 'profiles', '*.cfg')
+
+class FarmPowerHelper(PowerHelper):
+    # The displays' batteries are not visible from here, so every frame shows the plug icon
+    def get_battery(self, refresh: bool = False) -> float:
+        return -1
+
+def parse_profiles(values: Optional[list[str]]) -> dict[str, str]:
+    if not values:
+        return { os.path.splitext(os.path.basename(path))[0]: path for path in sorted(glob.glob(DEFAULT_PROFILES)) }
+    profiles = {}
+    for value in values:
+        (name, _, path) = value.partition('=')
+        if not name or not path:
+            raise ValueError(f'Profiles are given as NAME=CONFIG, got {value!r}')
+        profiles[name] = path
+    return profiles
+
+def render_profile(name: str, config_path: str, data: bytes) -> tuple[str, bytes, str, list[tuple[int, int, int, int]]]:
+    # Profiles render in parallel, so each keeps its own caches rather than rewriting shared ones
+    icon_atlas.path = os.path.join('cache', 'farm', name, 'icons')
+    chrome_cache.path = os.path.join('cache', 'farm', name, 'chrome.bin')
+    config = OrganizerConfig.load(config_path)
+    # The farm already uses every core across profiles
+    config = replace(config, display=replace(config.display, render_workers=0))
+    epd = epd7in5b_V2.EPD()
+    dashboard = Dashboard(Summary.from_json(data), epd.width, epd.height, FarmPowerHelper(), config)
+    dashboard.render()
+    (black_buffer, red_buffer) = dashboard.getbuffers(epd)
+    digest = frame_digest(black_buffer, red_buffer, epd.width, dashboard.excluded_regions)
+    return (name, encode_frame([black_buffer, red_buffer], epd.width, epd.height), digest, dashboard.excluded_regions)
+
+def render_frames(profiles: dict[str, str], data: bytes, generation: Optional[int], output_dir: str, workers: int) -> list[str]:
+    os.makedirs(output_dir, exist_ok=True)
+    width = epd7in5b_V2.EPD_WIDTH
+    height = epd7in5b_V2.EPD_HEIGHT
+    with ProcessPoolExecutor(workers or None) as executor:
+        results = list(executor.map(render_profile, profiles.keys(), profiles.values(), [data] * len(profiles)))
+
+    changed = []
+    entries = {}
+    for (name, frame, digest, excluded_regions) in results:
+        file = f'{name}.frame'
+        sha256 = file_digest(frame)
+        path = os.path.join(output_dir, file)
+        try:
+            with open(path, 'rb') as frame_file:
+                unchanged = file_digest(frame_file.read()) == sha256
+        except IOError:
+            unchanged = False
+        if not unchanged:
+            write_atomic(path, frame)
+            changed.append(file)
+        entries[name] = FrameEntry(file, width, height, sha256, digest, [list(region) for region in excluded_regions])
+        logger.info(f"Rendered {name} ({'changed' if not unchanged else 'unchanged'})")
+
+    manifest = FrameManifest(datetime.now().astimezone().isoformat(), generation, entries)
+    write_atomic(os.path.join(output_dir, MANIFEST_NAME), manifest.to_json().encode())
+    return changed + [MANIFEST_NAME]
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description='Render packed frames for several displays from one payload')
+    argument_parser.add_argument('--profile', action='append', help='Display profile as NAME=CONFIG, may be repeated (default: config/profiles/*.cfg)')
+    argument_parser.add_argument('--payload', help='Payload file to render instead of fetching current.json')
+    argument_parser.add_argument('--output', default=FRAMES_PREFIX, help='Directory to write the frames and manifest to')
+    argument_parser.add_argument('--workers', type=int, default=0, help='Worker processes (default: one per core)')
+    argument_parser.add_argument('--upload', action='store_true', help=f'Upload changed frames and the manifest under {FRAMES_PREFIX}/ in the payload bucket')
+    args = argument_parser.parse_args()
+    logging.basicConfig(format="%(asctime)s %(levelname)s - %(message)s", level=logging.INFO)
+
+    profiles = parse_profiles(args.profile)
+    if not profiles:
+        sys.exit(f'No profiles given and none found at {DEFAULT_PROFILES}')
+    fetcher = create_fetcher()
+    if args.payload:
+        with open(args.payload, 'rb') as payload_file:
+            (data, generation) = (payload_file.read(), None)
+    else:
+        payload = fetcher.fetch()
+        (data, generation) = (payload.data, payload.metadata.generation)
+
+    written = render_frames(profiles, data, generation, args.output, args.workers)
+    if args.upload:
+        bucket = fetcher.client.bucket(fetcher.bucket_name)
+        # The manifest is last, so displays never see an entry before its frame exists
+        for file in written:
+            bucket.blob(f'{FRAMES_PREFIX}/{file}').upload_from_filename(os.path.join(args.output, file))
+            logger.info(f"Uploaded {file}")
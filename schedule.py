@@ -1,81 +1,64 @@
 import logging;
-import os;
-from configparser import SafeConfigParser
-from dateutil import parser
+from column import Column
+from column_fit import fit_boxes, ItemBox, overflow_text
+from fonts import FontConfig, font_registry
+from organizer_config import OrganizerConfig
 from PIL import ImageDraw, ImageFont
 from summary import Meeting
-from textwrap import wrap
-from typing import List
+from text_metrics import text_metrics
+from text_wrap import text_wrapper
+from typing import Iterator, List
 
 logger = logging.getLogger(__name__)
 
-class ScheduleConfig(object):
+class ScheduleConfig(FontConfig):
+    fonts = ('header_font', 'header_icon_font', 'body_font')
 
-    def __init__(self):
-        self.parser = SafeConfigParser()
-        self.parser.sections()
-        found = self.parser.read('config/organizer.cfg')
-        if not found:
-            raise ValueError('No config file found!')
-        self.fontdir = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'font')
-    
     @property
     def header_font(self) -> ImageFont:
-        font = self.parser.get('schedule', 'header_font')
-        font_size = int(self.parser.get('schedule', 'header_font_size'))
-        return ImageFont.truetype(os.path.join(self.fontdir, f'{font}.ttf'), font_size)
+        return font_registry.get(self.config.font_path(self.config.schedule.font), self.config.schedule.font_size)
     
     @property
     def header_icon_font(self) -> ImageFont:
-        font = self.parser.get('schedule', 'header_font')
-        font_size = int(self.parser.get('schedule', 'header_font_size'))
-        return ImageFont.truetype(os.path.join(self.fontdir, 'fa5-regular.otf'), 25)
+        return font_registry.get(self.config.font_path('fa5-regular', 'otf'), 25)
 
     @property
     def body_font(self) -> ImageFont:
-        font = self.parser.get('body', 'font')
-        font_size = int(self.parser.get('body', 'font_size'))
-        return ImageFont.truetype(os.path.join(self.fontdir, f'{font}.ttf'), font_size)
+        return font_registry.get(self.config.font_path(self.config.body.font), self.config.body.font_size)
 
-class Schedule(object):
+class Schedule(Column):
+    icon = '\uf133'
+    header_text = 'Schedule'
 
-    def __init__(self, meetings: List[Meeting], box_start: tuple[int, int], box_end: tuple[int, int]):
-        self.config = ScheduleConfig()
+    def __init__(self, meetings: List[Meeting], box_start: tuple[int, int], box_end: tuple[int, int], config: OrganizerConfig):
+        super().__init__(box_start, box_end)
+        self.config = ScheduleConfig(config)
         self.meetings = meetings
-        self.box_start = box_start
-        self.box_end = box_end
 
-    def draw_header(self, image: ImageDraw) -> int:
-        icon = '\uf133'
-        header_text = 'Schedule'
-        (x, y) = self.box_start
-        (max_x, max_y) = self.box_end
-        (icon_w, icon_h) = image.textsize(icon, font = self.config.header_icon_font)
-        (text_w, text_h) = image.textsize(header_text, font=self.config.header_font)
-        action_list_header_offset = x + int((max_x - x - text_w - icon_w - 10) / 2)
-        image.text((action_list_header_offset, y + 2), icon, font=self.config.header_icon_font)
-        image.text((action_list_header_offset + icon_w + 10, y), header_text, font=self.config.header_font)
-        
-        return y + text_h + 10
+    def measure_schedule(self) -> Iterator[ItemBox]:
+        (x, _) = self.box_start
+        (max_x, _) = self.box_end
+        for meeting in self.meetings:
+            event_time = meeting.start_time.strftime("%H:%M") + " \u2014 "
+            (event_time_w, event_time_h) = text_metrics.size(event_time, self.config.body_font)
+            event_text = '\n'.join(text_wrapper.wrap(meeting.summary, self.config.body_font, max_x - x - 8 - event_time_w))
+            (event_w, event_h) = text_metrics.size(event_text, self.config.body_font)
+            yield ItemBox(meeting, 4 + event_h + 6 + 1, [(event_time, event_time_w, event_time_h), (event_text, event_w, event_h)])
 
-    def draw_schedule(self, image: ImageDraw, start_y: int) -> None:
+    def draw_body(self, image: ImageDraw, start_y: int) -> None:
         y = start_y
         (x, _) = self.box_start
         (max_x, max_y) = self.box_end
-        for i, meeting in enumerate(self.meetings):
-            event_time = parser.parse(meeting.start_time).strftime("%H:%M") + " \u2014 "
-            event_text = '\n'.join(wrap(meeting.summary, width=27))
+        (_, overflow_h) = text_metrics.size(overflow_text(len(self.meetings)), self.config.body_font)
+        (visible, hidden) = fit_boxes(self.measure_schedule(), len(self.meetings), max_y - start_y, 4 + overflow_h)
+        for i, box in enumerate(visible):
+            [(event_time, event_time_w, _), (event_text, _, event_h)] = box.lines
             y += 4
-            (event_time_w, event_time_h) = image.textsize(event_time, font=self.config.body_font)
-            (event_w, event_h) = image.textsize(event_text, font=self.config.body_font)
             image.text((x + 8, y), event_time, font = self.config.body_font)
             image.text((x + 8 + event_time_w, y), event_text, font = self.config.body_font)
             y += event_h + 6
-            if i < len(self.meetings) - 1:
+            if i < len(visible) - 1 or hidden:
                 image.rectangle([(x, y), (max_x, y)], fill = "#000000")
                 y += 1
-
-    def render(self, black_image: ImageDraw, red_image: ImageDraw) -> None:
-        logger.info("Rendering")
-        body_y = self.draw_header(black_image)
-        self.draw_schedule(black_image, body_y)
+        if hidden:
+            image.text((x + 8, y + 4), overflow_text(hidden), font = self.config.body_font)
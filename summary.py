@@ -1,31 +1,112 @@
-from dataclasses import dataclass
-from dataclasses_json import dataclass_json, LetterCase
-from typing import List, Optional
+import json
+import logging
+from dataclasses import dataclass, Field, fields
+from datetime import datetime
+from functools import lru_cache
+from typing import List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# JSON has a single number type, so whole-number fields still accept the odd decimal
+ACCEPTED_TYPES = { int: (int, float) }
+
+def parse_timestamp(value: str) -> datetime:
+    try:
+        # fromisoformat only learns about the Z suffix in Python 3.11
+        return datetime.fromisoformat(value[:-1] + '+00:00' if value.endswith('Z') else value)
+    except ValueError:
+        from dateutil import parser
+        return parser.parse(value)
+
+def camel_case(name: str) -> str:
+    (first, *rest) = name.split('_')
+    return first + ''.join(word.capitalize() for word in rest)
+
+@lru_cache(maxsize=None)
+def json_fields(model: type) -> dict[str, Field]:
+    return { camel_case(field.name): field for field in fields(model) }
+
+class PayloadModel(object):
+    __slots__ = ()
+
+    # Converters for fields that are not taken from the JSON as is
+    converters = {}
+
+    @classmethod
+    def from_dict(cls, data: dict, path: str):
+        if not isinstance(data, dict):
+            raise ValueError(f"{path}: expected an object but got {type(data).__name__}")
+        names = json_fields(cls)
+        unknown = data.keys() - names.keys()
+        if unknown:
+            # The payload API adds fields ahead of the display, so these are not fatal
+            logger.warning(f"{path}: ignoring unknown fields {', '.join(sorted(unknown))}")
+        values = {}
+        for (key, field) in names.items():
+            if key not in data:
+                raise ValueError(f"{path}.{key}: missing required field")
+            value = data[key]
+            expected = str if field.name in cls.converters else field.type
+            # bool is an int in Python, but a JSON true where a number belongs is a payload bug
+            if not isinstance(value, ACCEPTED_TYPES.get(expected, expected)) or (expected is int and isinstance(value, bool)):
+                raise ValueError(f"{path}.{key}: expected {expected.__name__} but got {type(value).__name__}")
+            if field.name in cls.converters:
+                try:
+                    value = cls.converters[field.name](value)
+                except (ValueError, OverflowError) as e:
+                    raise ValueError(f"{path}.{key}: {e}") from e
+            values[field.name] = value
+        return cls(**values)
 
-@dataclass_json(letter_case=LetterCase.CAMEL)
 @dataclass
-class Meeting:
-    start_time: str
-    end_time: str
+class Meeting(PayloadModel):
+    __slots__ = ('start_time', 'end_time', 'summary')
+    converters = { 'start_time': parse_timestamp, 'end_time': parse_timestamp }
+    start_time: datetime
+    end_time: datetime
     summary: str
 
-@dataclass_json(letter_case=LetterCase.CAMEL)
 @dataclass
-class Task:
+class Task(PayloadModel):
+    __slots__ = ('complete', 'summary')
     complete: bool
     summary: str
 
-@dataclass_json(letter_case=LetterCase.CAMEL)
 @dataclass
-class Weather:
-    time: str
-    condition: str
+class Weather(PayloadModel):
+    __slots__ = ('time', 'condition', 'temperature', 'precipitation')
+    converters = { 'time': parse_timestamp }
+    time: datetime
+    condition: int
     temperature: int
     precipitation: int
 
-@dataclass_json(letter_case=LetterCase.CAMEL)
+def decode_list(model: type, data: Optional[list], path: str) -> list:
+    if data is None:
+        return []
+    if not isinstance(data, list):
+        raise ValueError(f"{path}: expected a list but got {type(data).__name__}")
+    return [model.from_dict(item, f"{path}[{i}]") for (i, item) in enumerate(data)]
+
 @dataclass
-class Summary:
-    schedule: Optional[List[Meeting]]
-    tasks: Optional[List[Task]]
-    weather: Optional[List[Weather]]
+class Summary(object):
+    __slots__ = ('schedule', 'tasks', 'weather')
+    schedule: List[Meeting]
+    tasks: List[Task]
+    weather: List[Weather]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Summary':
+        if not isinstance(data, dict):
+            raise ValueError(f"payload: expected an object but got {type(data).__name__}")
+        return cls(
+            decode_list(Meeting, data.get('schedule'), 'schedule'),
+            decode_list(Task, data.get('tasks'), 'tasks'),
+            decode_list(Weather, data.get('weather'), 'weather'))
+
+    @classmethod
+    def from_json(cls, data: Union[str, bytes]) -> 'Summary':
+        try:
+            return cls.from_dict(json.loads(data))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"payload: invalid JSON ({e})") from e
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# Tests drive the display code through the simulator backend rather than GPIO and SPI
+os.environ.setdefault('EPD_BACKEND', 'simulator')
+os.environ.setdefault('EPD_SIMULATOR_OUTPUT', '')
+root = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+for path in [root, os.path.join(root, 'lib')]:
+    if path not in sys.path:
+        sys.path.insert(0, path)
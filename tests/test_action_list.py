@@ -0,0 +1,31 @@
+import os
+
+import pytest
+from action_list import ActionList
+from layout import Layout
+from organizer_config import OrganizerConfig
+from PIL import Image, ImageDraw
+from summary import Task
+
+OPEN = Task(False, 'Follow up with the facilities team about the broken badge reader')
+DONE = Task(True, 'Done')
+
+@pytest.fixture
+def config():
+    config = OrganizerConfig.load()
+    if not os.path.exists(config.font_path('fa5-regular', 'otf')):
+        pytest.skip(f'Fonts are not installed in {config.fontdir}')
+    return config
+
+def draw(tasks: list[Task], config: OrganizerConfig) -> tuple[Image.Image, int]:
+    layout = Layout(800, 480, config)
+    action_list = ActionList(tasks, layout.right_column_start, layout.right_column_end, config)
+    image = Image.new('1', (800, 480), 255)
+    action_list.render(ImageDraw.Draw(image), None, include_header=False)
+    (_, max_y) = layout.right_column_end
+    return (image, max_y)
+
+def test_collapsed_completed_tasks_stay_inside_the_column(config):
+    # The open tasks alone fit, but the "+3 more" line for the completed ones still needs room
+    (image, max_y) = draw([OPEN] * 6 + [DONE] * 3, config)
+    assert image.crop((0, max_y + 1, 800, 480)).getextrema() == (255, 255)
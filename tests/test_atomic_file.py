@@ -0,0 +1,12 @@
+from atomic_file import write_atomic
+
+def test_replaces_the_file_and_cleans_up(tmp_path):
+    path = str(tmp_path / 'frame.bin')
+    write_atomic(path, b'old')
+    write_atomic(path, b'new')
+    assert (tmp_path / 'frame.bin').read_bytes() == b'new'
+    assert [entry.name for entry in tmp_path.iterdir()] == ['frame.bin']
+
+def test_text_is_written_as_text(tmp_path):
+    write_atomic(str(tmp_path / 'meta.json'), '{"generation": 1}')
+    assert (tmp_path / 'meta.json').read_text() == '{"generation": 1}'
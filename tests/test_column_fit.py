@@ -0,0 +1,38 @@
+from column_fit import fit_boxes, ItemBox, overflow_text
+
+def boxes(*heights: int) -> list[ItemBox]:
+    return [ItemBox(i, height) for (i, height) in enumerate(heights)]
+
+def test_everything_fits():
+    (visible, hidden) = fit_boxes(boxes(10, 10, 10), 3, 30, 8)
+    assert ([box.item for box in visible], hidden) == ([0, 1, 2], 0)
+
+def test_overflow_line_takes_the_last_box():
+    # The third box does not fit, and the second gives up its space to "+2 more"
+    (visible, hidden) = fit_boxes(boxes(10, 10, 10), 3, 25, 8)
+    assert ([box.item for box in visible], hidden) == ([0], 2)
+
+def test_overflow_line_fits_after_the_last_box():
+    (visible, hidden) = fit_boxes(boxes(10, 10, 10), 3, 28, 8)
+    assert ([box.item for box in visible], hidden) == ([0, 1], 1)
+
+def test_dropped_items_reserve_the_overflow_line():
+    # Everything passed in fits, but the items left out beforehand still need "+N more"
+    (visible, hidden) = fit_boxes(boxes(10, 10, 10), 3, 30, 8, dropped=2)
+    assert ([box.item for box in visible], hidden) == ([0, 1], 3)
+
+def test_dropped_items_with_room_to_spare():
+    (visible, hidden) = fit_boxes(boxes(10, 10), 2, 30, 8, dropped=2)
+    assert ([box.item for box in visible], hidden) == ([0, 1], 2)
+
+def test_boxes_past_the_overflow_are_not_measured():
+    measured = []
+    def measure():
+        for box in boxes(10, 10, 10, 10):
+            measured.append(box.item)
+            yield box
+    fit_boxes(measure(), 4, 15, 0)
+    assert measured == [0, 1]
+
+def test_overflow_text():
+    assert overflow_text(3) == '+3 more'
@@ -0,0 +1,28 @@
+from frame_diff import FULL, PARTIAL, plan_update, SKIP
+
+WIDTH = 800
+HEIGHT = 480
+PLANE = b'\xff' * (WIDTH // 8 * HEIGHT)
+CLOCK = (720, 16, 768, 32)
+
+def inked(plane: bytes, x: int, y: int) -> bytes:
+    changed = bytearray(plane)
+    changed[y * WIDTH // 8 + x // 8] = 0x00
+    return bytes(changed)
+
+def test_unchanged_frame_is_skipped():
+    assert plan_update((PLANE, PLANE), (PLANE, PLANE), WIDTH, HEIGHT, 0.5, [CLOCK]) == (SKIP, None)
+
+def test_partial_window_covers_the_clock():
+    current = (inked(PLANE, 400, 440), PLANE)
+    (action, window) = plan_update((PLANE, PLANE), current, WIDTH, HEIGHT, 0.5, [CLOCK])
+    assert action == PARTIAL
+    assert window == (400, 16, 768, 441)
+
+def test_clock_counts_towards_the_area_limit():
+    current = (inked(PLANE, 0, 440), PLANE)
+    assert plan_update((PLANE, PLANE), current, WIDTH, HEIGHT, 0.05)[0] == PARTIAL
+    assert plan_update((PLANE, PLANE), current, WIDTH, HEIGHT, 0.05, [CLOCK]) == (FULL, None)
+
+def test_no_stored_frame_is_a_full_refresh():
+    assert plan_update(None, (PLANE, PLANE), WIDTH, HEIGHT, 0.5) == (FULL, None)
@@ -0,0 +1,49 @@
+import pytest
+from frame_format import CHUNK_SIZE, decode_frame, encode_frame, iter_plane, read_header
+from waveshare_epd import epd7in5b_V2, epdconfig
+
+WIDTH = 800
+HEIGHT = 480
+
+def planes():
+    size = WIDTH // 8 * HEIGHT
+    black = bytearray(b'\xff' * size)
+    black[1000:3000] = bytes(i % 256 for i in range(2000))
+    red = bytearray(b'\xff' * size)
+    red[40000:40100] = b'\x00' * 100
+    return (bytes(black), bytes(red))
+
+def test_round_trip_is_compressed():
+    (black, red) = planes()
+    frame = encode_frame([black, red], WIDTH, HEIGHT)
+    (header, decoded) = decode_frame(frame)
+    assert (header.width, header.height, decoded) == (WIDTH, HEIGHT, [black, red])
+    assert len(frame) * 10 < len(black) + len(red)
+
+def test_plane_is_streamed_in_chunks():
+    (black, red) = planes()
+    frame = encode_frame([black, red], WIDTH, HEIGHT)
+    chunks = list(iter_plane(frame, read_header(frame), 0))
+    assert all(len(chunk) <= CHUNK_SIZE for chunk in chunks)
+    assert b''.join(chunks) == black
+
+def test_damaged_frame_is_rejected():
+    frame = bytearray(encode_frame(list(planes()), WIDTH, HEIGHT))
+    frame[-3] ^= 0xFF
+    with pytest.raises(ValueError):
+        read_header(bytes(frame))
+    with pytest.raises(ValueError):
+        read_header(b'not a frame at all')
+
+def test_streamed_refresh_matches_display():
+    (black, red) = planes()
+    frame = encode_frame([black, red], WIDTH, HEIGHT)
+    header = read_header(frame)
+    epd = epd7in5b_V2.EPD()
+    simulator = epdconfig.implementation
+    simulator.reset()
+    epd.display(black, red)
+    expected = (simulator.last_data(0x10), simulator.last_data(0x13))
+    simulator.reset()
+    epd.display_chunks(iter_plane(frame, header, 0), iter_plane(frame, header, 1))
+    assert (simulator.last_data(0x10), simulator.last_data(0x13)) == expected
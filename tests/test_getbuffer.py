@@ -0,0 +1,42 @@
+import random
+
+import pytest
+from PIL import Image
+from waveshare_epd import epd7in5b_V2
+
+# The per-pixel packing getbuffer used before it switched to Image.tobytes
+def legacy_getbuffer(epd, image):
+    buf = [0xFF] * (int(epd.width/8) * epd.height)
+    image_monocolor = image.convert('1')
+    imwidth, imheight = image_monocolor.size
+    pixels = image_monocolor.load()
+    if(imwidth == epd.width and imheight == epd.height):
+        for y in range(imheight):
+            for x in range(imwidth):
+                if pixels[x, y] == 0:
+                    buf[int((x + y * epd.width) / 8)] &= ~(0x80 >> (x % 8))
+    elif(imwidth == epd.height and imheight == epd.width):
+        for y in range(imheight):
+            for x in range(imwidth):
+                newx = y
+                newy = epd.height - x - 1
+                if pixels[x, y] == 0:
+                    buf[int((newx + newy*epd.width) / 8)] &= ~(0x80 >> (y % 8))
+    return buf
+
+def noise(size):
+    generator = random.Random(size[0] * size[1])
+    return Image.frombytes('L', size, bytes(generator.choice((0, 255)) for _ in range(size[0] * size[1])))
+
+@pytest.fixture(scope='module')
+def epd():
+    return epd7in5b_V2.EPD()
+
+@pytest.mark.parametrize('orientation', ['landscape', 'portrait'])
+def test_matches_legacy_packing(epd, orientation):
+    size = (epd.width, epd.height) if orientation == 'landscape' else (epd.height, epd.width)
+    image = noise(size)
+    assert bytes(epd.getbuffer(image)) == bytes(legacy_getbuffer(epd, image))
+
+def test_other_sizes_are_blank(epd):
+    assert bytes(epd.getbuffer(noise((100, 100)))) == bytes(legacy_getbuffer(epd, noise((100, 100))))
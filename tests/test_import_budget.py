@@ -0,0 +1,14 @@
+from import_budget import check, DEFAULT_BUDGET_MS, import_times, SKIP_PATH
+
+def test_skip_path_imports_within_budget():
+    assert check(SKIP_PATH, DEFAULT_BUDGET_MS, 0) == []
+
+def test_total_covers_the_fetch_imports():
+    (main_ms, _) = import_times(['main'])
+    (skip_ms, times) = import_times(SKIP_PATH)
+    assert 'google.cloud.storage' in { name for (name, _, _) in times }
+    assert skip_ms > main_ms
+
+def test_render_modules_and_slow_imports_are_reported():
+    assert any('over the 0ms budget' in problem for problem in check(['frame_diff'], 0, 0))
+    assert 'dashboard imports render-only module PIL' in check(['dashboard'], DEFAULT_BUDGET_MS, 0)
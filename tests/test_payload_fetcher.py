@@ -0,0 +1,80 @@
+import pytest
+from google.api_core import exceptions
+from payload_fetcher import PayloadFetcher
+
+class StubBlob(object):
+
+    def __init__(self, client: 'StubClient'):
+        self.client = client
+        self.generation = None
+        self.md5_hash = None
+        self.etag = None
+
+    # Behaves like download_as_bytes on a bucket holding one object at client.generation
+    def download_as_bytes(self, if_generation_not_match=None) -> bytes:
+        self.client.downloads.append(if_generation_not_match)
+        if self.client.error is not None:
+            raise self.client.error
+        if if_generation_not_match == self.client.generation:
+            raise exceptions.NotModified('unchanged')
+        (self.generation, self.md5_hash, self.etag) = (self.client.generation, 'md5', 'etag')
+        return self.client.data
+
+class StubBucket(object):
+
+    def __init__(self, client: 'StubClient'):
+        self.client = client
+
+    def blob(self, name: str) -> StubBlob:
+        return StubBlob(self.client)
+
+class StubClient(object):
+
+    def __init__(self, data: bytes = b'{}', generation: int = 1):
+        self.data = data
+        self.generation = generation
+        self.error = None
+        self.downloads = []
+
+    def bucket(self, name: str) -> StubBucket:
+        return StubBucket(self)
+
+def fetcher(tmp_path, client: StubClient, blob_name: str = 'current.json') -> PayloadFetcher:
+    return PayloadFetcher('project', 'bucket', blob_name, cache_dir=str(tmp_path), client=client)
+
+def test_download_is_cached(tmp_path):
+    client = StubClient(b'{"schedule": []}', 7)
+    payload = fetcher(tmp_path, client).fetch()
+    assert (payload.data, payload.metadata.generation) == (b'{"schedule": []}', 7)
+    cached = fetcher(tmp_path, client).read_cache()
+    assert (cached.data, cached.metadata, cached.updated) == (payload.data, payload.metadata, payload.updated)
+
+def test_unchanged_generation_reuses_the_cache(tmp_path):
+    client = StubClient(b'first', 3)
+    first = fetcher(tmp_path, client).fetch()
+    client.data = b'not downloaded'
+    second = fetcher(tmp_path, client).fetch()
+    assert client.downloads == [None, 3]
+    assert (second.data, second.metadata) == (first.data, first.metadata)
+
+def test_new_generation_is_downloaded(tmp_path):
+    client = StubClient(b'first', 3)
+    fetcher(tmp_path, client).fetch()
+    (client.data, client.generation) = (b'second', 4)
+    assert fetcher(tmp_path, client).fetch().data == b'second'
+
+def test_network_error_falls_back_to_the_cache(tmp_path):
+    client = StubClient(b'cached', 3)
+    fetcher(tmp_path, client).fetch()
+    client.error = exceptions.ServiceUnavailable('down')
+    assert fetcher(tmp_path, client).fetch().data == b'cached'
+
+def test_network_error_without_a_cache_is_raised(tmp_path):
+    client = StubClient()
+    client.error = exceptions.ServiceUnavailable('down')
+    with pytest.raises(exceptions.ServiceUnavailable):
+        fetcher(tmp_path, client).fetch()
+
+def test_nested_blob_names_are_cached(tmp_path):
+    fetcher(tmp_path, StubClient(b'frame'), 'frames/kitchen.frame').fetch()
+    assert (tmp_path / 'frames' / 'kitchen.frame').read_bytes() == b'frame'
@@ -0,0 +1,97 @@
+import socket
+import threading
+
+import pytest
+from power import PowerHelper
+
+class FakePowerManager(object):
+
+    # Answers one request per line, like the power manager daemon, and records what it was sent
+    def __init__(self, responses: dict[str, str]):
+        self.responses = responses
+        self.requests = []
+        self.connections = 0
+        self.server = socket.socket()
+        self.server.bind(('127.0.0.1', 0))
+        self.server.listen()
+        self.port = self.server.getsockname()[1]
+        threading.Thread(target=self.serve, daemon=True).start()
+
+    def serve(self) -> None:
+        while True:
+            try:
+                (connection, _) = self.server.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self.handle, args=(connection,), daemon=True).start()
+
+    def handle(self, connection: socket.socket) -> None:
+        with connection, connection.makefile('r', encoding='utf-8', newline='\n') as reader:
+            for line in reader:
+                command = line.rstrip()
+                self.requests.append(command)
+                response = self.responses.get(command)
+                if response is None:
+                    return
+                connection.sendall(f'{response}\n'.encode('utf-8'))
+
+    def close(self) -> None:
+        self.server.close()
+
+@pytest.fixture
+def manager():
+    manager = FakePowerManager({
+        'get battery': 'battery: 64.5',
+        'get battery_v': 'battery_v: 3.9',
+        'get battery_charging': 'battery_charging: true',
+    })
+    yield manager
+    manager.close()
+
+def test_requests_share_one_connection(manager):
+    helper = PowerHelper(port=manager.port)
+    assert helper.get_battery() == 64.5
+    assert helper.get_battery_voltage() == 3.9
+    assert helper.is_charging() is True
+    helper.close()
+    assert manager.connections == 1
+
+def test_battery_is_cached_until_refreshed(manager):
+    helper = PowerHelper(port=manager.port)
+    helper.get_battery()
+    helper.get_battery()
+    assert manager.requests == ['get battery']
+    helper.get_battery(refresh=True)
+    assert manager.requests == ['get battery', 'get battery']
+    helper.close()
+
+def test_reconnects_after_the_connection_drops(manager):
+    helper = PowerHelper(port=manager.port)
+    assert helper.get_battery_voltage() == 3.9
+    # An unknown command makes the fake close the connection, as the daemon does when it drops idle clients
+    with pytest.raises(OSError):
+        helper.request('get unknown')
+    assert helper.get_battery(refresh=True) == 64.5
+    helper.close()
+    assert manager.connections >= 2
+
+def test_unexpected_response_is_rejected(manager):
+    manager.responses['get rtc_time'] = 'battery: 64.5'
+    helper = PowerHelper(port=manager.port)
+    assert helper.get_rtc_time() is None
+    helper.close()
+
+def test_missing_power_manager_falls_back_once():
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    port = server.getsockname()[1]
+    server.close()
+    helper = PowerHelper(port=port, timeout=0.5)
+    attempts = []
+    connect = helper._connect
+    helper._connect = lambda: (attempts.append(1), connect())
+    assert helper.get_battery() == -1
+    assert helper.get_battery() == -1
+    # One request, retried once, for the whole run
+    assert len(attempts) == 2
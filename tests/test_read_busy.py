@@ -0,0 +1,38 @@
+import time
+
+import pytest
+from waveshare_epd import epd7in5b_V2, epdconfig
+
+@pytest.fixture
+def epd():
+    epdconfig.implementation.reset()
+    return epd7in5b_V2.EPD()
+
+def hold_busy(seconds: float) -> None:
+    epdconfig.implementation.busy_until = time.monotonic() + seconds
+
+def test_waits_for_busy_to_clear(epd):
+    hold_busy(0.05)
+    epd.ReadBusy()
+    assert 40 <= epd.last_busy_ms < 1000
+
+def test_polls_with_backoff_without_edge_detection(epd, monkeypatch):
+    monkeypatch.delattr(epdconfig, 'wait_for_edge')
+    delays = []
+    monkeypatch.setattr(epdconfig, 'delay_ms', lambda ms: (delays.append(ms), time.sleep(ms / 1000)))
+    hold_busy(0.2)
+    epd.ReadBusy()
+    assert epd.last_busy_ms >= 190
+    # Doubling from 1ms and capped at 100ms, then the settling delay after BUSY clears
+    assert delays[:4] == [1, 2, 4, 8]
+    assert max(delays[:-1]) <= 100
+    assert delays[-1] == 200
+
+def test_stuck_panel_times_out_and_is_released(epd, monkeypatch):
+    exits = []
+    monkeypatch.setattr(epdconfig, 'module_exit', lambda: exits.append(1))
+    hold_busy(10)
+    epd.busy_timeout_ms = 50
+    with pytest.raises(TimeoutError):
+        epd.ReadBusy()
+    assert exits == [1]
@@ -0,0 +1,33 @@
+import math
+
+import pytest
+from waveshare_epd import epd7in5b_V2, epdconfig
+
+@pytest.fixture
+def epd():
+    epdconfig.implementation.reset()
+    return epd7in5b_V2.EPD()
+
+def planes(epd):
+    size = int(epd.width / 8) * epd.height
+    return (bytes(i % 251 for i in range(size)), bytes(0xFF - i % 13 for i in range(size)))
+
+def test_display_sends_planes_in_bulk_chunks(epd):
+    (black, red) = planes(epd)
+    epd.display(black, red)
+    simulator = epdconfig.implementation
+    chunks = math.ceil(len(black) / epd7in5b_V2.SPI_CHUNK_SIZE)
+    # DATA_START_TRANSMISSION 1 and 2, DISPLAY_REFRESH and one status read while BUSY, plus each plane in SPI-sized chunks
+    assert simulator.spi_calls == 4 + 2 * chunks
+    assert simulator.last_data(0x10) == black
+    assert simulator.last_data(0x13) == red.translate(epd7in5b_V2.INVERT_TABLE)
+
+def test_display_partial_sends_window_in_bulk_chunks(epd):
+    (black, red) = planes(epd)
+    epd.display_partial(black, red, 0, 0, 400, 100)
+    simulator = epdconfig.implementation
+    window = int(400 / 8) * 100
+    assert simulator.last_data(0x10) == epd.window_buffer(black, 0, 0, 400, 100)
+    assert len(simulator.last_data(0x13)) == window
+    # PARTIAL_IN, PARTIAL_WINDOW and its nine data bytes, two planes, DISPLAY_REFRESH, one status read and PARTIAL_OUT
+    assert simulator.spi_calls == 2 + 9 + 2 * (1 + math.ceil(window / epd7in5b_V2.SPI_CHUNK_SIZE)) + 3
@@ -0,0 +1,63 @@
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from summary import parse_timestamp, Summary
+
+MEETING = { 'startTime': '2022-03-07T08:00:00-05:00', 'endTime': '2022-03-07T08:30:00-05:00', 'summary': 'Standup' }
+TASK = { 'complete': False, 'summary': 'Review pull request' }
+WEATHER = { 'time': '2022-03-07T09:00:00-05:00', 'condition': 1000, 'temperature': 41, 'precipitation': 10 }
+
+def payload(**overrides) -> str:
+    data = { 'schedule': [MEETING], 'tasks': [TASK], 'weather': [WEATHER] }
+    data.update(overrides)
+    return json.dumps(data)
+
+def test_decodes_a_payload():
+    summary = Summary.from_json(payload())
+    assert summary.schedule[0].start_time == datetime(2022, 3, 7, 8, tzinfo=timezone(timedelta(hours=-5)))
+    assert summary.schedule[0].summary == 'Standup'
+    assert summary.tasks[0].complete is False
+    weather = summary.weather[0]
+    assert (weather.condition, weather.temperature, weather.precipitation) == (1000, 41, 10)
+
+def test_null_lists_are_empty():
+    summary = Summary.from_json(json.dumps({ 'schedule': None, 'tasks': None, 'weather': None }))
+    assert (summary.schedule, summary.tasks, summary.weather) == ([], [], [])
+
+def test_missing_field_is_rejected():
+    task = { 'summary': 'No completion flag' }
+    with pytest.raises(ValueError, match=r'tasks\[0\]\.complete: missing required field'):
+        Summary.from_json(payload(tasks=[task]))
+
+def test_wrong_type_is_rejected():
+    with pytest.raises(ValueError, match=r'weather\[0\]\.condition: expected int but got str'):
+        Summary.from_json(payload(weather=[dict(WEATHER, condition='1000')]))
+
+def test_bool_is_not_an_int():
+    with pytest.raises(ValueError, match=r'weather\[0\]\.temperature: expected int but got bool'):
+        Summary.from_json(payload(weather=[dict(WEATHER, temperature=True)]))
+
+def test_whole_numbers_accept_decimals():
+    assert Summary.from_json(payload(weather=[dict(WEATHER, temperature=41.5)])).weather[0].temperature == 41.5
+
+def test_bad_timestamp_is_rejected():
+    with pytest.raises(ValueError, match=r'schedule\[0\]\.startTime'):
+        Summary.from_json(payload(schedule=[dict(MEETING, startTime='not a time')]))
+
+def test_invalid_json_is_rejected():
+    with pytest.raises(ValueError, match='invalid JSON'):
+        Summary.from_json(b'{')
+
+def test_unknown_fields_are_logged(caplog):
+    with caplog.at_level(logging.WARNING, logger='summary'):
+        summary = Summary.from_json(payload(tasks=[dict(TASK, priority=1, due='today')]))
+    assert summary.tasks[0].summary == 'Review pull request'
+    assert 'tasks[0]: ignoring unknown fields due, priority' in caplog.text
+
+def test_z_suffix_is_utc():
+    assert parse_timestamp('2022-03-07T13:00:00Z') == datetime(2022, 3, 7, 13, tzinfo=timezone.utc)
+
+def test_other_formats_fall_back_to_dateutil():
+    assert parse_timestamp('Mon, 07 Mar 2022 13:00:00 +0000') == datetime(2022, 3, 7, 13, tzinfo=timezone.utc)
@@ -0,0 +1,65 @@
+import json
+import os
+from collections import OrderedDict
+from dataclasses import replace
+from datetime import datetime
+
+import header
+import pytest
+from chrome_cache import chrome_cache
+from dashboard import Dashboard
+from icon_atlas import icon_atlas
+from organizer_config import OrganizerConfig
+from summary import Summary
+from text_wrap import text_wrapper
+from waveshare_epd import epd7in5b_V2
+
+PAYLOAD = json.dumps({
+    'schedule': [{ 'startTime': '2022-03-07T08:00:00-05:00', 'endTime': '2022-03-07T08:30:00-05:00', 'summary': 'Standup' }],
+    'tasks': [{ 'complete': False, 'summary': 'Review pull request' }, { 'complete': True, 'summary': 'Water the plants' }],
+    'weather': [{ 'time': '2022-03-07T09:00:00-05:00', 'condition': 1000, 'temperature': 41, 'precipitation': 10 }],
+})
+
+class FixedDatetime(datetime):
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2022, 3, 7, 8, 15)
+
+    @classmethod
+    def today(cls):
+        return cls.now()
+
+class FixedPowerHelper(object):
+
+    def get_battery(self, refresh: bool = False) -> float:
+        return 50.0
+
+@pytest.fixture
+def config(monkeypatch, tmp_path):
+    config = OrganizerConfig.load()
+    if not os.path.exists(config.font_path('fa5-solid', 'otf')):
+        pytest.skip(f'Fonts are not installed in {config.fontdir}')
+    monkeypatch.setattr(icon_atlas, 'path', str(tmp_path / 'icons'))
+    monkeypatch.setattr(chrome_cache, 'path', str(tmp_path / 'chrome.bin'))
+    # Workers fork after this, so both renders draw the same minute
+    monkeypatch.setattr(header, 'datetime', FixedDatetime)
+    # Otherwise the clock is not excluded, and excluded_regions would be empty either way
+    return replace(config, header=replace(config.header, refresh_on_clock_change=False))
+
+def render(config: OrganizerConfig, workers: int) -> tuple[tuple[bytes, bytes], list[tuple[int, int, int, int]]]:
+    epd = epd7in5b_V2.EPD()
+    config = replace(config, display=replace(config.display, render_workers=workers))
+    dashboard = Dashboard(Summary.from_json(PAYLOAD), epd.width, epd.height, FixedPowerHelper(), config)
+    dashboard.render()
+    return (dashboard.getbuffers(epd), dashboard.excluded_regions)
+
+def test_tiles_match_a_single_process_render(config):
+    (planes, excluded_regions) = render(config, 0)
+    assert excluded_regions
+    assert render(config, 2) == (planes, excluded_regions)
+
+def test_tiles_warm_the_parent_caches(config, monkeypatch):
+    monkeypatch.setattr(text_wrapper, '_lines', OrderedDict())
+    render(config, 2)
+    assert ('Review pull request',) in text_wrapper._lines.values()
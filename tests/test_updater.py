@@ -0,0 +1,36 @@
+import pytest
+import updater
+
+class FailingFetcher(object):
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+    def fetch(self):
+        raise self.error
+
+class RecordingPowerHelper(object):
+
+    def __init__(self):
+        self.boot_times = []
+
+    def get_battery(self, refresh: bool = False) -> float:
+        return 50.0
+
+    def set_next_boot_datetime(self, boot_time) -> None:
+        self.boot_times.append(boot_time)
+
+    def close(self) -> None:
+        pass
+
+@pytest.mark.parametrize('error', [RuntimeError('spidev unavailable'), ValueError('bad payload'), ConnectionError('offline')])
+def test_failed_update_still_schedules_the_next_wake(monkeypatch, tmp_path, error):
+    monkeypatch.chdir(tmp_path)
+    power_helper = RecordingPowerHelper()
+    commands = []
+    monkeypatch.setattr(updater, 'PowerHelper', lambda: power_helper)
+    monkeypatch.setattr(updater, 'create_update_fetcher', lambda profile: FailingFetcher(error))
+    monkeypatch.setattr(updater.os, 'system', commands.append)
+    updater.run_once()
+    assert len(power_helper.boot_times) == 1
+    assert commands == ['sudo shutdown -h now']
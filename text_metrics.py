@@ -0,0 +1,62 @@
+import logging
+from collections import OrderedDict
+from PIL import Image, ImageDraw, ImageFont
+
+logger = logging.getLogger(__name__)
+
+class TextMetrics(object):
+
+    def __init__(self, maxsize: int = 2048):
+        self.maxsize = maxsize
+        self._caches = { 'size': OrderedDict(), 'length': OrderedDict() }
+        # Only set in tile workers, which send what they measured back to the parent with their tile
+        self.added = None
+        self.hits = 0
+        self.misses = 0
+        # Measure against a mode '1' canvas so bounding boxes match what components draw
+        self._draw = ImageDraw.Draw(Image.new('1', (1, 1)))
+
+    def _key(self, font: ImageFont, text: str) -> tuple:
+        return (getattr(font, 'path', id(font)), getattr(font, 'size', None), text)
+
+    def _store(self, cache: OrderedDict, key: tuple, value) -> None:
+        cache[key] = value
+        if len(cache) > self.maxsize:
+            cache.popitem(last=False)
+
+    def _lookup(self, name: str, key: tuple, measure):
+        cache = self._caches[name]
+        value = cache.get(key)
+        if value is not None:
+            self.hits += 1
+            cache.move_to_end(key)
+            return value
+        self.misses += 1
+        value = measure()
+        self._store(cache, key, value)
+        if self.added is not None:
+            self.added.append((name, key, value))
+        return value
+
+    def track(self) -> None:
+        self.added = []
+
+    def merge(self, entries: list[tuple[str, tuple, object]]) -> None:
+        for (name, key, value) in entries:
+            if key not in self._caches[name]:
+                self._store(self._caches[name], key, value)
+
+    def size(self, text: str, font: ImageFont) -> tuple[int, int]:
+        def measure() -> tuple[int, int]:
+            (_, _, right, bottom) = self._draw.textbbox((0, 0), text, font=font)
+            return (right, bottom)
+        return self._lookup('size', self._key(font, text), measure)
+
+    def length(self, text: str, font: ImageFont) -> float:
+        return self._lookup('length', self._key(font, text), lambda: font.getlength(text))
+
+    def log_stats(self) -> None:
+        logger.info(f"Text metrics: {self.hits} hits, {self.misses} misses, {sum(len(cache) for cache in self._caches.values())} cached")
+
+# Lives as long as the process, so a daemon only measures strings it has not drawn before
+text_metrics = TextMetrics()
@@ -0,0 +1,78 @@
+import logging
+from bisect import bisect_right
+from collections import OrderedDict
+from itertools import accumulate
+from PIL import ImageFont
+from text_metrics import TextMetrics, text_metrics
+
+logger = logging.getLogger(__name__)
+
+class TextWrapper(object):
+
+    def __init__(self, metrics: TextMetrics = text_metrics, maxsize: int = 512):
+        self.metrics = metrics
+        self.maxsize = maxsize
+        self._lines = OrderedDict()
+        # Only set in tile workers, like TextMetrics.added
+        self.added = None
+
+    def split_word(self, word: str, font: ImageFont, width: float) -> list[str]:
+        # Cumulative advances let each break be found with a bisect instead of re-measuring every prefix
+        pieces = []
+        while word:
+            advances = list(accumulate(self.metrics.length(char, font) for char in word))
+            end = max(1, bisect_right(advances, width))
+            pieces.append(word[:end])
+            word = word[end:]
+        return pieces
+
+    def wrap(self, text: str, font: ImageFont, width: float) -> list[str]:
+        key = (text, getattr(font, 'path', id(font)), getattr(font, 'size', None), width)
+        lines = self._lines.get(key)
+        if lines is not None:
+            self._lines.move_to_end(key)
+            return list(lines)
+
+        space_w = self.metrics.length(' ', font)
+        lines = []
+        line = []
+        line_w = 0.0
+        for word in text.split():
+            word_w = self.metrics.length(word, font)
+            if word_w > width:
+                pieces = self.split_word(word, font, width)
+                if line:
+                    lines.append(' '.join(line))
+                lines.extend(pieces[:-1])
+                line = [pieces[-1]]
+                line_w = self.metrics.length(pieces[-1], font)
+            elif line and line_w + space_w + word_w > width:
+                lines.append(' '.join(line))
+                line = [word]
+                line_w = word_w
+            else:
+                line_w += (space_w if line else 0) + word_w
+                line.append(word)
+        if line:
+            lines.append(' '.join(line))
+
+        self._store(key, tuple(lines))
+        if self.added is not None:
+            self.added.append((key, tuple(lines)))
+        return lines
+
+    def _store(self, key: tuple, lines: tuple[str, ...]) -> None:
+        self._lines[key] = lines
+        if len(self._lines) > self.maxsize:
+            self._lines.popitem(last=False)
+
+    def track(self) -> None:
+        self.added = []
+
+    def merge(self, entries: list[tuple[tuple, tuple[str, ...]]]) -> None:
+        for (key, lines) in entries:
+            if key not in self._lines:
+                self._store(key, lines)
+
+# Keyed on font and column width as well as the text, so the same title wraps separately in each column
+text_wrapper = TextWrapper()
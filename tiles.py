@@ -0,0 +1,54 @@
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from icon_atlas import icon_atlas
+from PIL import Image
+from text_metrics import text_metrics
+from text_wrap import text_wrapper
+from timing import timer
+
+logger = logging.getLogger(__name__)
+
+# Set just before the workers fork, so they inherit the dashboard instead of unpickling it
+_dashboard = None
+
+def render_tile(name: str) -> tuple[str, float, list[bytes], bool, tuple, dict, list, list]:
+    # Each worker draws on its own copy-on-write copy of the full canvas, so components keep
+    # their absolute coordinates; only their region is sent back, with whatever drawing left
+    # behind in the worker's copy of the dashboard and caches
+    dashboard = _dashboard
+    text_metrics.track()
+    text_wrapper.track()
+    start = time.perf_counter()
+    dict(dashboard.stages)[name]()
+    elapsed = time.perf_counter() - start
+    tiles = [image.crop(dashboard.regions[name]).tobytes() for image in dashboard.images]
+    red_drawn = dashboard.canvas is not None and dashboard.draw_redimg.drawn
+    return (name, elapsed, tiles, red_drawn, dashboard.header.clock_region, icon_atlas.added, text_metrics.added, text_wrapper.added)
+
+def render_tiles(dashboard, names: list[str], workers: int) -> None:
+    global _dashboard
+    # Resolve anything that would otherwise need a socket or lock in every worker
+    dashboard.header.power_helper.get_battery()
+    _dashboard = dashboard
+    try:
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork')) as executor:
+            results = list(executor.map(render_tile, names))
+    finally:
+        _dashboard = None
+
+    for (name, elapsed, tiles, red_drawn, clock_region, glyphs, sizes, lines) in results:
+        timer.add(f'render.{name}', elapsed)
+        region = dashboard.regions[name]
+        for (image, tile) in zip(dashboard.images, tiles):
+            size = (region[2] - region[0], region[3] - region[1])
+            image.paste(Image.frombytes(image.mode, size, tile), region[:2])
+        if red_drawn:
+            dashboard.draw_redimg.drawn = True
+        # Only the header's worker draws the clock, and the parent needs it for excluded_regions
+        if name == 'header':
+            dashboard.header.clock_region = clock_region
+        icon_atlas.merge(glyphs)
+        text_metrics.merge(sizes)
+        text_wrapper.merge(lines)
@@ -0,0 +1,71 @@
+import argparse
+import json
+import logging
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+class WakeTimer(object):
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.started = time.perf_counter()
+        self.stages = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def record(self, **fields) -> dict:
+        return {
+            'time': datetime.now().astimezone().isoformat(),
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 1),
+            **fields,
+            'stages_ms': { name: round(seconds * 1000, 1) for (name, seconds) in self.stages.items() }
+        }
+
+    def write(self, path: str = 'timings.jsonl', **fields) -> None:
+        record = self.record(**fields)
+        logger.info(f"Wake took {record['total_ms']}ms")
+        with open(path, 'a') as timings_file:
+            timings_file.write(json.dumps(record) + '\n')
+
+# Shared by every stage of a wake cycle so one record covers the whole run
+timer = WakeTimer()
+
+def summarize(path: str) -> None:
+    from statistics import quantiles
+    samples = {}
+    with open(path, 'r') as timings_file:
+        for line in timings_file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            samples.setdefault('total', []).append(record['total_ms'])
+            for (name, ms) in record['stages_ms'].items():
+                samples.setdefault(name, []).append(ms)
+    print(f"{'stage':<24}{'n':>6}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}")
+    for (name, values) in sorted(samples.items(), key=lambda item: -max(item[1])):
+        if len(values) > 1:
+            percentiles = quantiles(values, n=100, method='inclusive')
+            (p50, p90, p99) = (percentiles[49], percentiles[89], percentiles[98])
+        else:
+            p50 = p90 = p99 = values[0]
+        print(f"{name:<24}{len(values):>6}{p50:>10.1f}{p90:>10.1f}{p99:>10.1f}{max(values):>10.1f}")
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description='Summarize wake-cycle timings (milliseconds)')
+    argument_parser.add_argument('path', nargs='?', default='timings.jsonl')
+    summarize(argument_parser.parse_args().path)
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import logging
+import os
+from datetime import datetime, timedelta, tzinfo
+from frame_diff import FrameStore, PARTIAL, plan_update, SKIP, splice_window
+from frame_hash import blank_regions, frame_digest, read_last_digest, write_last_digest
+from frame_format import iter_plane
+from frame_manifest import check_frame, file_digest, FrameManifest, FRAMES_PREFIX, MANIFEST_NAME, unpack_frame
+from organizer_config import OrganizerConfig
+from payload_fetcher import Payload, PayloadFetcher
+from power import PowerHelper
+from timing import timer
+from typing import Optional, TYPE_CHECKING
+
+# Pillow, the payload decoder and the display driver are only imported once a render is needed,
+# so a wake that finds nothing to draw does not pay for them
+if TYPE_CHECKING:
+    from google.cloud import storage
+    from waveshare_epd.epd7in5b_V2 import EPD
+
+logger = logging.getLogger(__name__)
+
+def read_last_rendered() -> datetime:
+    last_rendered = datetime.now().astimezone() - timedelta(weeks=52)
+    try:
+        with open('last_rendered.txt', 'r') as last_rendered_file:
+            data = last_rendered_file.readline().replace("\n", "")
+            last_rendered = datetime.fromisoformat(data).astimezone()
+    except IOError:
+        logger.info("Last rendered file did not exist")
+    return last_rendered
+
+def next_wake_time(now: datetime) -> datetime:
+    now = now.replace(minute=55, second=0, microsecond=0)
+    next_run = now + timedelta(hours=2)
+    if now.weekday() >= 5: # It is a weekend, so update less often
+        next_run = now + timedelta(hours=4)
+    if next_run.hour < 8 or next_run.hour >= 19:
+        next_run = now.replace(hour=7) + timedelta(days=1)
+    return next_run
+
+def create_epd() -> EPD:
+    with timer.span('import.render'):
+        from waveshare_epd import epd7in5b_V2
+    return epd7in5b_V2.EPD()
+
+def render_payload(payload: Payload, config: OrganizerConfig, epd: EPD, power_helper: PowerHelper, frame_store: FrameStore) -> None:
+    with timer.span('import.render'):
+        from dashboard import Dashboard
+        from summary import Summary
+    with timer.span('json.decode'):
+        summary = Summary.from_json(payload.data)
+    dashboard = Dashboard(summary, epd.width, epd.height, power_helper, config)
+    dashboard.render()
+    with timer.span('getbuffer'):
+        (black_buffer, red_buffer) = dashboard.getbuffers(epd)
+    display_frame(black_buffer, red_buffer, dashboard.excluded_regions, config, epd, frame_store)
+
+def display_frame(black_buffer: bytes, red_buffer: bytes, excluded_regions: list[tuple[int, int, int, int]], config: OrganizerConfig, epd: EPD, frame_store: FrameStore) -> None:
+    digest = frame_digest(black_buffer, red_buffer, epd.width, excluded_regions)
+    action = SKIP
+    if digest != read_last_digest():
+        with timer.span('frame_diff'):
+            masked = tuple(blank_regions(bytes(buffer), epd.width, excluded_regions) for buffer in (black_buffer, red_buffer))
+            (action, window) = plan_update(frame_store.load(epd.width, epd.height), masked, epd.width, epd.height, config.display.max_partial_area, excluded_regions)
+
+    if action == SKIP:
+        logger.info("Rendered frame is unchanged so skipping display refresh")
+    else:
+        logger.info("Init screen")
+        with timer.span('epd.init'):
+            epd.init()
+        # epd.Clear()
+        if action == PARTIAL:
+            logger.info(f"Begin painting window {window}")
+            with timer.span('epd.display_partial'):
+                epd.display_partial(black_buffer, red_buffer, *window)
+        else:
+            logger.info("Begin painting")
+            with timer.span('epd.display'):
+                epd.display(black_buffer, red_buffer)
+        logger.info("End painting")
+        logger.info("Set display to sleep")
+        with timer.span('epd.sleep'):
+            epd.sleep()
+        timer.add('epd.busy', epd.busy_seconds)
+        write_last_digest(digest)
+        frame_store.save(*masked, epd.width, epd.height)
+    write_last_rendered()
+
+# With partial refreshes off there is nothing to diff, so a packed frame goes to the panel
+# as it is decompressed, without holding either plane in memory
+def stream_frame(data: bytes, digest: str, epd: EPD, frame_store: FrameStore) -> None:
+    header = check_frame(data, epd.width, epd.height)
+    logger.info("Init screen")
+    with timer.span('epd.init'):
+        epd.init()
+    logger.info("Begin painting")
+    with timer.span('epd.display'):
+        epd.display_chunks(iter_plane(data, header, 0), iter_plane(data, header, 1))
+    logger.info("End painting")
+    logger.info("Set display to sleep")
+    with timer.span('epd.sleep'):
+        epd.sleep()
+    timer.add('epd.busy', epd.busy_seconds)
+    write_last_digest(digest)
+    frame_store.discard()
+    write_last_rendered()
+
+def write_last_rendered() -> None:
+    # Store last time the screen was rendered
+    with open("last_rendered.txt", "w") as last_rendered_file:
+        last_rendered_file.write(datetime.now().astimezone().isoformat());
+
+def render_header(config: OrganizerConfig, epd: EPD, power_helper: PowerHelper, frame_store: FrameStore) -> None:
+    with timer.span('import.render'):
+        from dashboard import Dashboard
+        from summary import Summary
+    logger.info("Refreshing header only")
+    dashboard = Dashboard(Summary([], [], []), epd.width, epd.height, power_helper, config)
+    dashboard.render_header()
+    with timer.span('getbuffer'):
+        (black_buffer, red_buffer) = dashboard.getbuffers(epd)
+    with timer.span('epd.init'):
+        epd.init()
+    with timer.span('epd.display_partial'):
+        epd.display_partial(black_buffer, red_buffer, *dashboard.header_region)
+    with timer.span('epd.sleep'):
+        epd.sleep()
+    timer.add('epd.busy', epd.busy_seconds)
+
+    # Keep the stored frame in step with what the panel now shows
+    previous = frame_store.load(epd.width, epd.height)
+    if previous is not None:
+        masked = tuple(blank_regions(bytes(buffer), epd.width, dashboard.excluded_regions) for buffer in (black_buffer, red_buffer))
+        spliced = tuple(splice_window(before, after, epd.width, dashboard.header_region) for (before, after) in zip(previous, masked))
+        frame_store.save(*spliced, epd.width, epd.height)
+        write_last_digest(frame_digest(*spliced, epd.width))
+
+def update(config: OrganizerConfig, fetcher: PayloadFetcher, power_helper: PowerHelper, frame_store: FrameStore, epd: Optional[EPD] = None, header_only: bool = True) -> bool:
+    last_rendered = read_last_rendered()
+    payload = fetcher.fetch()
+    last_updated = payload.updated
+    logger.info(f"Calendar was last updated at {last_rendered.isoformat()} and payload was last updated at {last_updated.isoformat()}")
+    render = True
+    if last_updated < last_rendered:
+        logger.info("Payload has not been updated since last render")
+        render = False
+
+    if render:
+        epd = epd or create_epd()
+        epd.busy_seconds = 0.0
+        render_payload(payload, config, epd, power_helper, frame_store)
+    elif header_only and config.header.partial_refresh:
+        epd = epd or create_epd()
+        epd.busy_seconds = 0.0
+        render_header(config, epd, power_helper, frame_store)
+    return render
+
+# Thin client: show the frame render_farm.py packed for this display's profile, without Pillow or fonts
+def update_from_farm(config: OrganizerConfig, fetcher: PayloadFetcher, profile: str, frame_store: FrameStore, epd: Optional[EPD] = None) -> bool:
+    manifest = FrameManifest.from_json(fetcher.fetch().data)
+    entry = manifest.profiles.get(profile)
+    if entry is None:
+        raise ValueError(f"Profile {profile} is not in the frame manifest")
+    if entry.digest == read_last_digest():
+        logger.info(f"Frame for {profile} is unchanged so skipping download")
+        return False
+
+    frame = create_fetcher(f'{FRAMES_PREFIX}/{entry.file}', fetcher.client).fetch()
+    if file_digest(frame.data) != entry.sha256:
+        # The manifest and frame are uploaded separately, so the next poll will see them agree
+        logger.error(f"Frame for {profile} does not match the manifest, skipping it")
+        return False
+    epd = epd or create_epd()
+    epd.busy_seconds = 0.0
+    if config.display.max_partial_area > 0:
+        (black_buffer, red_buffer) = unpack_frame(frame.data, epd.width, epd.height)
+        display_frame(black_buffer, red_buffer, [tuple(region) for region in entry.excluded_regions], config, epd, frame_store)
+    else:
+        stream_frame(frame.data, entry.digest, epd, frame_store)
+    return True
+
+def create_fetcher(blob_name: str = 'current.json', client: 'storage.Client' = None) -> PayloadFetcher:
+    return PayloadFetcher("dashboard-api-279503", "inpulsetech-calendar", blob_name, client=client)
+
+def create_update_fetcher(profile: Optional[str]) -> PayloadFetcher:
+    return create_fetcher(f'{FRAMES_PREFIX}/{MANIFEST_NAME}' if profile else 'current.json')
+
+def shutdown_if_on_battery(power_helper: PowerHelper, render: bool) -> None:
+    power_level = power_helper.get_battery()
+    power_helper.close()
+    timer.write(battery=power_level, rendered=render)
+    if power_level >= 0:
+        logger.info(f"Battery power at {power_level} after updating calendar")
+        logger.info("Shutting down")
+        os.system("sudo shutdown -h now")
+    else:
+        logger.info("On dedicated power so not shutting down")
+
+def run_once(profile: Optional[str] = None) -> None:
+    with timer.span('config'):
+        config = OrganizerConfig.load()
+    power_helper = PowerHelper()
+    render = False
+    # Whatever goes wrong with this update, the next wake still has to be scheduled before shutting down
+    try:
+        if profile:
+            render = update_from_farm(config, create_update_fetcher(profile), profile, FrameStore())
+        else:
+            render = update(config, create_update_fetcher(profile), power_helper, FrameStore())
+    except Exception:
+        logger.exception("Update failed")
+
+    logger.info("Set next wake time")
+    power_helper.set_next_boot_datetime(next_wake_time(datetime.now()))
+    shutdown_if_on_battery(power_helper, render)